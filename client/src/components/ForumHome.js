@@ -17,11 +17,13 @@ function ForumHome({ user, userLanguage, supportedLanguages }) {
   const [loading, setLoading] = useState(true);
   const [likedPosts, setLikedPosts] = useState(new Set());
   const [searchTerm, setSearchTerm] = useState('');
+  // 服务端检索结果；为 null 时退回到对当前页的本地过滤
+  const [searchResults, setSearchResults] = useState(null);
 
   // eslint-disable-next-line react-hooks/exhaustive-deps
   const fetchPosts = React.useCallback(async () => {
     try {
-      const response = await fetch(`${config.API_BASE_URL}${config.API_ENDPOINTS.POSTS}/`);
+      const response = await fetch(`${config.API_BASE_URL}${config.API_ENDPOINTS.POSTS}/?view=summary`);
       const data = await response.json();
       
       if (response.ok) {
@@ -41,6 +43,73 @@ function ForumHome({ user, userLanguage, supportedLanguages }) {
     fetchPosts();
   }, [fetchPosts]);
 
+  // 订阅服务端推送的帖子事件，无需重新拉取整个列表
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return undefined;
+
+    const source = new EventSource(`${config.API_BASE_URL}${config.API_ENDPOINTS.EVENTS}/stream`);
+    const payload = (event) => JSON.parse(event.data).data;
+
+    source.addEventListener('post_created', (event) => {
+      const post = payload(event);
+      setPosts(prev => prev.some(p => p.id === post.id) ? prev : [post, ...prev]);
+    });
+    source.addEventListener('post_liked', (event) => {
+      const { post_id, likes } = payload(event);
+      setPosts(prev => prev.map(p => p.id === post_id ? { ...p, likes } : p));
+    });
+    source.addEventListener('reply_created', (event) => {
+      const { post_id, reply } = payload(event);
+      setPosts(prev => prev.map(p =>
+        p.id === post_id
+          ? { ...p, reply_count: (p.reply_count ?? 0) + 1, last_reply_at: reply.timestamp }
+          : p
+      ));
+    });
+    source.addEventListener('post_deleted', (event) => {
+      const { post_id } = payload(event);
+      setPosts(prev => prev.filter(p => p.id !== post_id));
+    });
+    // 消费过慢被服务端断开后会自动重连，重新拉取一次以补齐错过的事件
+    source.addEventListener('dropped', () => fetchPosts());
+
+    return () => source.close();
+  }, [fetchPosts]);
+
+  useEffect(() => {
+    const query = searchTerm.trim();
+    if (!query) {
+      setSearchResults(null);
+      return undefined;
+    }
+
+    const controller = new AbortController();
+    const timer = setTimeout(async () => {
+      try {
+        const params = new URLSearchParams({ q: query, limit: '50' });
+        const response = await fetch(
+          `${config.API_BASE_URL}${config.API_ENDPOINTS.POSTS}/search?${params}`,
+          { signal: controller.signal }
+        );
+        if (!response.ok) {
+          throw new Error(`Search failed: ${response.status}`);
+        }
+        const data = await response.json();
+        setSearchResults(data.posts);
+      } catch (error) {
+        if (error.name !== 'AbortError') {
+          // 后端不支持检索时使用本地过滤
+          setSearchResults(null);
+        }
+      }
+    }, 300);
+
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [searchTerm]);
+
   const handleLike = async (postId) => {
     if (!user) {
       toast.info('Please login to like posts');
@@ -55,6 +124,7 @@ function ForumHome({ user, userLanguage, supportedLanguages }) {
         method: 'PUT',
         headers: {
           'Content-Type': 'application/json',
+          'X-User-Id': user.id,
         },
         body: JSON.stringify({ action }),
       });
@@ -68,6 +138,13 @@ function ForumHome({ user, userLanguage, supportedLanguages }) {
             ? { ...post, likes: data.likes }
             : post
         ));
+        if (searchResults) {
+          setSearchResults(searchResults.map(post =>
+            post.id === postId
+              ? { ...post, likes: data.likes }
+              : post
+          ));
+        }
 
         // Update liked posts set
         const newLikedPosts = new Set(likedPosts);
@@ -105,12 +182,12 @@ function ForumHome({ user, userLanguage, supportedLanguages }) {
     }
   };
 
-  const filteredPosts = posts.filter(post => {
+  const filteredPosts = searchTerm && searchResults ? searchResults : posts.filter(post => {
     if (!searchTerm) return true;
     const searchLower = searchTerm.toLowerCase();
     return (
       post.title.toLowerCase().includes(searchLower) ||
-      post.content.toLowerCase().includes(searchLower) ||
+      (post.excerpt ?? post.content ?? '').toLowerCase().includes(searchLower) ||
       post.author.toLowerCase().includes(searchLower)
     );
   });
@@ -223,7 +300,7 @@ function ForumHome({ user, userLanguage, supportedLanguages }) {
                 </h2>
                 <div className="text-gray-700 line-clamp-3">
                   <TranslatedContent
-                    content={post.content}
+                    content={post.excerpt ?? post.content}
                     sourceLanguage={post.language}
                     targetLanguage={userLanguage}
                   />
@@ -254,7 +331,7 @@ function ForumHome({ user, userLanguage, supportedLanguages }) {
                     className="flex items-center space-x-1 text-gray-500 hover:text-primary-600 transition-colors"
                   >
                     <ChatBubbleLeftIcon className="h-5 w-5" />
-                    <span className="text-sm font-medium">{post.replies?.length || 0}</span>
+                    <span className="text-sm font-medium">{post.reply_count ?? post.replies?.length ?? 0}</span>
                   </Link>
                 </div>
 
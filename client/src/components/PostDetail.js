@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { 
   ArrowLeftIcon, 
@@ -21,6 +21,49 @@ function PostDetail({ user, userLanguage, supportedLanguages }) {
   const [replyContent, setReplyContent] = useState('');
   const [replyLanguage, setReplyLanguage] = useState(userLanguage);
   const [submittingReply, setSubmittingReply] = useState(false);
+  const [replies, setReplies] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingReplies, setLoadingReplies] = useState(false);
+
+  const replyIds = useRef(new Set());
+
+  // 去重地追加回复（自己提交的回复也会通过事件推送回来），返回新增的数量
+  const appendReplies = (items) => {
+    const fresh = items.filter(r => !replyIds.current.has(r.id));
+    fresh.forEach(r => replyIds.current.add(r.id));
+    if (fresh.length > 0) {
+      setReplies(prev => [...prev, ...fresh]);
+    }
+    return fresh.length;
+  };
+
+  const replyAdded = (reply) => {
+    if (appendReplies([reply]) > 0) {
+      setPost(p => p && p.reply_count !== undefined
+        ? { ...p, reply_count: p.reply_count + 1, last_reply_at: reply.timestamp }
+        : p
+      );
+    }
+  };
+
+  const fetchReplies = async (cursor = null) => {
+    setLoadingReplies(true);
+    try {
+      const params = new URLSearchParams({ limit: '20' });
+      if (cursor) params.set('cursor', cursor);
+      const response = await fetch(`${config.API_BASE_URL}${config.API_ENDPOINTS.POSTS}/${id}/replies?${params}`);
+      if (!response.ok) {
+        throw new Error(`Failed to load replies: ${response.status}`);
+      }
+      const data = await response.json();
+      appendReplies(data.replies);
+      setNextCursor(data.next_cursor);
+    } catch (error) {
+      console.error('Error fetching replies:', error);
+    } finally {
+      setLoadingReplies(false);
+    }
+  };
 
   // eslint-disable-next-line react-hooks/exhaustive-deps
   const fetchPost = React.useCallback(async () => {
@@ -30,6 +73,15 @@ function PostDetail({ user, userLanguage, supportedLanguages }) {
 
       if (response.ok) {
         setPost(data);
+        replyIds.current = new Set();
+        setReplies([]);
+        setNextCursor(null);
+        if (Array.isArray(data.replies)) {
+          // 旧版后端把回复内嵌在帖子中
+          appendReplies(data.replies);
+        } else {
+          fetchReplies();
+        }
       } else {
         throw new Error(data.error || 'Post not found');
       }
@@ -46,6 +98,34 @@ function PostDetail({ user, userLanguage, supportedLanguages }) {
     fetchPost();
   }, [fetchPost]);
 
+  // 订阅服务端推送的事件，实时显示新回复和点赞数
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return undefined;
+
+    const source = new EventSource(`${config.API_BASE_URL}${config.API_ENDPOINTS.EVENTS}/stream`);
+    const payload = (event) => JSON.parse(event.data).data;
+
+    source.addEventListener('reply_created', (event) => {
+      const { post_id, reply } = payload(event);
+      if (post_id !== id) return;
+      replyAdded(reply);
+    });
+    source.addEventListener('post_liked', (event) => {
+      const { post_id, likes } = payload(event);
+      if (post_id !== id) return;
+      setPost(prev => prev ? { ...prev, likes } : prev);
+    });
+    source.addEventListener('post_deleted', (event) => {
+      if (payload(event).post_id !== id) return;
+      toast.info('This post has been deleted');
+      navigate('/');
+    });
+    source.addEventListener('dropped', () => fetchPost());
+
+    return () => source.close();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [id, navigate, fetchPost]);
+
   const handleLike = async () => {
     if (!user) {
       toast.info('Please login to like posts');
@@ -59,6 +139,7 @@ function PostDetail({ user, userLanguage, supportedLanguages }) {
         method: 'PUT',
         headers: {
           'Content-Type': 'application/json',
+          'X-User-Id': user.id,
         },
         body: JSON.stringify({ action }),
       });
@@ -107,10 +188,7 @@ function PostDetail({ user, userLanguage, supportedLanguages }) {
       const data = await response.json();
 
       if (response.ok) {
-        setPost(prev => ({
-          ...prev,
-          replies: [...(prev.replies || []), data]
-        }));
+        replyAdded(data);
         setReplyContent('');
         toast.success('Reply posted successfully!');
       } else {
@@ -245,7 +323,7 @@ function PostDetail({ user, userLanguage, supportedLanguages }) {
 
           <div className="flex items-center space-x-2 text-gray-500">
             <ChatBubbleLeftIcon className="h-6 w-6" />
-            <span className="font-medium">{post.replies?.length || 0}</span>
+            <span className="font-medium">{post.reply_count ?? replies.length}</span>
             <span>Replies</span>
           </div>
         </div>
@@ -318,12 +396,12 @@ function PostDetail({ user, userLanguage, supportedLanguages }) {
 
       {/* Replies */}
       <div className="space-y-4">
-        {(post.replies?.length || 0) > 0 ? (
+        {replies.length > 0 ? (
           <>
             <h3 className="text-xl font-semibold text-gray-900">
-              Replies ({post.replies?.length || 0})
+              Replies ({post.reply_count ?? replies.length})
             </h3>
-            {(post.replies || []).map((reply) => (
+            {replies.map((reply) => (
               <div key={reply.id} className="bg-white rounded-lg border border-gray-200 p-6">
                 <div className="flex items-start space-x-3">
                   <div className="h-10 w-10 bg-gray-600 rounded-full flex items-center justify-center">
@@ -353,6 +431,17 @@ function PostDetail({ user, userLanguage, supportedLanguages }) {
                 </div>
               </div>
             ))}
+            {nextCursor && (
+              <div className="text-center">
+                <button
+                  onClick={() => fetchReplies(nextCursor)}
+                  className="text-primary-600 hover:text-primary-700 font-medium disabled:opacity-50"
+                  disabled={loadingReplies}
+                >
+                  {loadingReplies ? 'Loading...' : 'Load more replies'}
+                </button>
+              </div>
+            )}
           </>
         ) : (
           <div className="text-center py-8 text-gray-500">
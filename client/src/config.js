@@ -42,6 +42,7 @@ const config = {
     POSTS: '/api/posts',
     TRANSLATE: '/api/translate',
     AUTH: '/api/auth',
+    EVENTS: '/api/events',
     HEALTH: '/api/health'
   },
   
@@ -0,0 +1,55 @@
+"""
+快速JSON序列化：优先使用 orjson，其次 msgspec，都未安装时回退到标准库
+"""
+
+from fastapi.responses import JSONResponse
+from typing import Any
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+    _msgspec_encoder = msgspec.json.Encoder()
+except ImportError:
+    msgspec = None
+    _msgspec_encoder = None
+
+if orjson is not None:
+    BACKEND = "orjson"
+elif msgspec is not None:
+    BACKEND = "msgspec"
+else:
+    BACKEND = "json"
+
+
+def is_enabled() -> bool:
+    """是否启用快速响应路径（FAST_JSON_RESPONSES=true）"""
+    return os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
+
+
+def dumps(content: Any) -> bytes:
+    """将对象序列化为紧凑的UTF-8 JSON字节串"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    if _msgspec_encoder is not None:
+        return _msgspec_encoder.encode(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """使用最快可用序列化后端的JSON响应类"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(JSONResponse):
+    """内容已经是序列化好的JSON字节串，直接输出"""
+
+    def render(self, content: bytes) -> bytes:
+        return content
@@ -4,6 +4,8 @@
 使用Python标准库，100%兼容所有Python版本
 """
 
+import gzip
+import hashlib
 import json
 import os
 import sys
@@ -11,16 +13,262 @@ import time
 import logging
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
+import queue
+import signal
 import threading
+import uuid
+from itertools import islice
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+try:
+    import brotli  # 可选：安装后优先使用brotli压缩
+except ImportError:
+    brotli = None
+
+# 分页默认值
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 50
+
+# 小于该字节数的响应不压缩
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# 语言列表是静态的，修改列表时递增版本号
+LANGUAGES_VERSION = 1
+
+# 进程启动标识：未配置 DATA_DIR 时帖子版本号重启后从0开始，混入ETag避免与重启前的ETag相同
+BOOT_EPOCH = uuid.uuid4().hex[:8]
+
+
+class PostStore:
+    """按ID索引的内存帖子存储，ID单调递增"""
+
+    def __init__(self):
+        self._posts = {}  # id -> post，dict保持插入顺序
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self.version = 0  # 每次写操作递增，作为WAL序号
+        self.listener = None  # 写操作回调: listener(record)
+
+    def __len__(self):
+        return len(self._posts)
+
+    def next_id(self):
+        """分配新的帖子ID（删除帖子后也不会复用）"""
+        with self._lock:
+            post_id = str(self._next_id)
+            self._next_id += 1
+            return post_id
+
+    def add(self, post):
+        self._commit({"op": "create", "post": post})
+
+    def add_reply(self, post_id, reply):
+        self._commit({"op": "reply", "post_id": post_id, "reply": reply})
+
+    def set_likes(self, post_id, likes):
+        self._commit({"op": "like", "post_id": post_id, "likes": likes})
+
+    def get(self, post_id):
+        return self._posts.get(post_id)
+
+    def page(self, page, limit):
+        """按创建时间倒序返回一页帖子"""
+        start = (page - 1) * limit
+        with self._lock:
+            return list(islice(reversed(self._posts.values()), start, start + limit))
+
+    def _commit(self, record):
+        """应用写操作并通知监听者"""
+        with self._lock:
+            self.version += 1
+            record["seq"] = self.version
+            self._apply(record)
+        if self.listener:
+            self.listener(record)
+
+    def _apply(self, record):
+        op = record["op"]
+        if op == "create":
+            post = record["post"]
+            self._posts[post["id"]] = post
+            if post["id"].isdigit():
+                self._next_id = max(self._next_id, int(post["id"]) + 1)
+        elif op == "reply":
+            post = self._posts.get(record["post_id"])
+            if post is not None:
+                post.setdefault("replies", []).append(record["reply"])
+        elif op == "like":
+            post = self._posts.get(record["post_id"])
+            if post is not None:
+                post["likes"] = record["likes"]
+
+    def replay(self, record):
+        """重放WAL记录（跳过已包含在快照中的记录）"""
+        with self._lock:
+            if record["seq"] <= self.version:
+                return False
+            self._apply(record)
+            self.version = record["seq"]
+            return True
+
+    def dump(self):
+        """序列化完整状态，用于写快照"""
+        with self._lock:
+            return json.dumps({
+                "version": self.version,
+                "next_id": self._next_id,
+                "posts": list(self._posts.values())
+            }, ensure_ascii=False, separators=(',', ':'))
+
+    def restore(self, snapshot):
+        """从快照恢复状态"""
+        with self._lock:
+            self._posts = {post["id"]: post for post in snapshot["posts"]}
+            self._next_id = snapshot["next_id"]
+            self.version = snapshot["version"]
+
+
+class PersistenceManager:
+    """快照 + 追加写JSON Lines预写日志，后台线程批量fsync
+
+    请求线程只把记录放进队列；数据丢失窗口由 WAL_FSYNC_INTERVAL 决定。
+    """
+
+    def __init__(self, store, data_dir, fsync_interval=1.0, snapshot_interval=300.0, snapshot_max_records=5000):
+        self.store = store
+        self.wal_path = os.path.join(data_dir, "posts.wal")
+        self.snapshot_path = os.path.join(data_dir, "posts.snapshot.json")
+        self.fsync_interval = fsync_interval
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_max_records = snapshot_max_records
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._writer_loop, name="wal-writer", daemon=True)
+        self._wal = None
+        self._records_since_snapshot = 0
+        os.makedirs(data_dir, exist_ok=True)
+
+    def load(self):
+        """启动时恢复：先加载快照，再重放WAL"""
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                self.store.restore(json.load(f))
+        replayed = 0
+        if os.path.exists(self.wal_path):
+            with open(self.wal_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 崩溃时最后一行可能只写了一半
+                        logger.warning("⚠️ 忽略损坏的WAL记录")
+                        break
+                    if self.store.replay(record):
+                        replayed += 1
+        logger.info(f"💾 已恢复 {len(self.store)} 个帖子（重放 {replayed} 条WAL记录）")
+        if replayed:
+            self.snapshot()
+
+    def start(self):
+        # load() 重放后做快照时已经截断并打开了WAL，直接沿用，避免泄漏文件句柄
+        if self._wal is None:
+            self._wal = open(self.wal_path, "a", encoding="utf-8")
+        self.store.listener = self.record
+        self._thread.start()
+
+    def record(self, record):
+        """写操作回调：只入队，不阻塞请求"""
+        self._queue.put(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+
+    def close(self):
+        """刷盘并停止后台线程"""
+        self.store.listener = None
+        self._queue.put(None)
+        self._thread.join()
+
+    def snapshot(self):
+        """写入压缩快照（先写临时文件再原子替换），然后截断WAL"""
+        data = self.store.dump()
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        # 快照之后WAL中的记录都可由序号跳过，直接截断
+        if self._wal:
+            self._wal.close()
+        self._wal = open(self.wal_path, "w", encoding="utf-8")
+        self._records_since_snapshot = 0
+
+    def _writer_loop(self):
+        last_sync = last_snapshot = time.monotonic()
+        dirty = False
+        while True:
+            try:
+                line = self._queue.get(timeout=self.fsync_interval)
+            except queue.Empty:
+                line = ""
+            stopping = line is None
+            # 一次取空队列，批量写入
+            while line:
+                self._wal.write(line + "\n")
+                self._records_since_snapshot += 1
+                dirty = True
+                try:
+                    line = self._queue.get_nowait()
+                except queue.Empty:
+                    line = ""
+                if line is None:
+                    stopping = True
+                    line = ""
+
+            now = time.monotonic()
+            if dirty and (stopping or now - last_sync >= self.fsync_interval):
+                self._wal.flush()
+                os.fsync(self._wal.fileno())
+                last_sync = now
+                dirty = False
+            if self._records_since_snapshot and (
+                self._records_since_snapshot >= self.snapshot_max_records
+                or now - last_snapshot >= self.snapshot_interval
+            ):
+                try:
+                    self.snapshot()
+                except OSError as e:
+                    logger.error(f"Snapshot error: {str(e)}")
+                last_snapshot = now
+            if stopping:
+                self._wal.close()
+                return
+
+
 # 内存存储
-posts_db = []
+posts_db = PostStore()
 translations_cache = {}
 
+
+def make_etag(collection, version, variant="", epoch=True):
+    """根据集合版本号生成强ETag，variant区分同一集合的不同表示；
+    版本号为常量的静态集合传 epoch=False，ETag在重启和多个进程之间保持不变"""
+    tag = f"{collection}-{BOOT_EPOCH}-{version}" if epoch else f"{collection}-{version}"
+    if variant:
+        tag += "-" + hashlib.sha1(variant.encode("utf-8")).hexdigest()[:12]
+    return f'"{tag}"'
+
+
+def _int_param(query, name, default, minimum=1, maximum=None):
+    """解析整数查询参数，非法值回退到默认值"""
+    try:
+        value = int(query.get(name, [default])[0])
+    except (TypeError, ValueError):
+        return default
+    value = max(minimum, value)
+    return min(value, maximum) if maximum else value
+
+
 class MultillingualForumHandler(BaseHTTPRequestHandler):
     def do_OPTIONS(self):
         """处理CORS预检请求"""
@@ -32,6 +280,7 @@ class MultillingualForumHandler(BaseHTTPRequestHandler):
         """处理GET请求"""
         try:
             path = urlparse(self.path).path
+            query = parse_qs(urlparse(self.path).query)
             
             if path == '/':
                 self.send_json_response({
@@ -49,11 +298,11 @@ class MultillingualForumHandler(BaseHTTPRequestHandler):
                     "python_version": f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
                 })
             elif path == '/api/posts/':
-                self.send_json_response({
-                    "posts": posts_db,
-                    "total": len(posts_db)
-                })
+                self.send_posts_page(query)
             elif path == '/api/translate/languages':
+                etag = make_etag("languages", LANGUAGES_VERSION, urlparse(self.path).query, epoch=False)
+                if self.check_not_modified(etag):
+                    return
                 self.send_json_response({
                     "zh": "Chinese (Simplified)",
                     "en": "English",
@@ -67,12 +316,15 @@ class MultillingualForumHandler(BaseHTTPRequestHandler):
                     "ko": "Korean",
                     "ar": "Arabic",
                     "hi": "Hindi"
-                })
+                }, etag=etag)
             elif path.startswith('/api/posts/'):
                 post_id = path.split('/')[-1]
                 post = self.get_post_by_id(post_id)
                 if post:
-                    self.send_json_response(post)
+                    etag = make_etag("posts", posts_db.version, self.path)
+                    if self.check_not_modified(etag):
+                        return
+                    self.send_json_response(post, etag=etag)
                 else:
                     self.send_error_response(404, "Post not found")
             else:
@@ -128,11 +380,32 @@ class MultillingualForumHandler(BaseHTTPRequestHandler):
             logger.error(f"PUT error: {str(e)}")
             self.send_error_response(500, f"Internal server error: {str(e)}")
 
+    def send_posts_page(self, query):
+        """分页返回帖子列表（最新的在前）"""
+        etag = make_etag("posts", posts_db.version, urlparse(self.path).query)
+        if self.check_not_modified(etag):
+            return
+        page = _int_param(query, "page", 1)
+        limit = _int_param(query, "limit", DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE)
+        total = len(posts_db)
+        total_pages = (total + limit - 1) // limit
+        self.send_json_response({
+            "posts": posts_db.page(page, limit),
+            "total": total,
+            "pagination": {
+                "current_page": page,
+                "total_pages": total_pages,
+                "total_posts": total,
+                "has_next": page * limit < total,
+                "has_prev": page > 1
+            }
+        }, etag=etag)
+
     def create_post(self, data):
         """创建新帖子"""
         try:
             new_post = {
-                "id": str(len(posts_db) + 1),
+                "id": posts_db.next_id(),
                 "title": data.get("title", ""),
                 "content": data.get("content", ""),
                 "author": data.get("author", "Anonymous"),
@@ -141,7 +414,7 @@ class MultillingualForumHandler(BaseHTTPRequestHandler):
                 "likes": 0,
                 "replies": []  # 添加回复字段
             }
-            posts_db.append(new_post)
+            posts_db.add(new_post)
             self.send_json_response(new_post)
             logger.info(f"Created post: {new_post['title']}")
         except Exception as e:
@@ -163,11 +436,7 @@ class MultillingualForumHandler(BaseHTTPRequestHandler):
                 "timestamp": str(int(time.time()))
             }
             
-            # 确保replies字段存在
-            if "replies" not in post:
-                post["replies"] = []
-            
-            post["replies"].append(new_reply)
+            posts_db.add_reply(post_id, new_reply)
             self.send_json_response(new_reply)
             logger.info(f"Added reply to post {post_id} by {new_reply['author']}")
             
@@ -184,9 +453,9 @@ class MultillingualForumHandler(BaseHTTPRequestHandler):
             
             action = data.get("action", "like")
             if action == "like":
-                post["likes"] = post.get("likes", 0) + 1
+                posts_db.set_likes(post_id, post.get("likes", 0) + 1)
             elif action == "unlike":
-                post["likes"] = max(0, post.get("likes", 0) - 1)
+                posts_db.set_likes(post_id, max(0, post.get("likes", 0) - 1))
             
             self.send_json_response({"likes": post["likes"]})
             logger.info(f"Post {post_id} {action}d, new count: {post['likes']}")
@@ -230,22 +499,71 @@ class MultillingualForumHandler(BaseHTTPRequestHandler):
 
     def get_post_by_id(self, post_id):
         """通过ID获取帖子"""
-        for post in posts_db:
-            if post["id"] == post_id:
-                # 确保帖子有replies字段
-                if "replies" not in post:
-                    post["replies"] = []
-                return post
+        post = posts_db.get(post_id)
+        if post is not None and "replies" not in post:
+            # 确保帖子有replies字段
+            post["replies"] = []
+        return post
+
+    def wants_pretty_json(self):
+        """是否请求了格式化输出（?pretty=1）"""
+        query = parse_qs(urlparse(self.path).query)
+        return query.get("pretty", ["0"])[0].lower() in ("1", "true", "yes")
+
+    def choose_encoding(self):
+        """根据Accept-Encoding选择压缩算法"""
+        accepted = set()
+        for item in self.headers.get('Accept-Encoding', '').split(','):
+            name, _, params = item.partition(';')
+            if params.strip().replace(' ', '') in ('q=0', 'q=0.0'):
+                continue
+            accepted.add(name.strip().lower())
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted:
+            return 'gzip'
         return None
 
-    def send_json_response(self, data, status_code=200):
-        """发送JSON响应"""
-        response = json.dumps(data, ensure_ascii=False, indent=2)
+    def check_not_modified(self, etag):
+        """If-None-Match命中时发送304并返回True"""
+        if_none_match = self.headers.get('If-None-Match')
+        if not if_none_match:
+            return False
+        encoding = self.choose_encoding()
+        for candidate in if_none_match.split(','):
+            candidate = candidate.strip()
+            if candidate == '*' or candidate == etag or (encoding and candidate == f'{etag[:-1]}-{encoding}"'):
+                self.send_response(304)
+                self.send_header('ETag', candidate if candidate != '*' else etag)
+                self.send_cors_headers()
+                self.end_headers()
+                return True
+        return False
+
+    def send_json_response(self, data, status_code=200, etag=None):
+        """发送JSON响应（默认紧凑格式，?pretty=1 时缩进输出；超过阈值时压缩）"""
+        if self.wants_pretty_json():
+            response = json.dumps(data, ensure_ascii=False, indent=2)
+        else:
+            response = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        body = response.encode('utf-8')
+        encoding = self.choose_encoding() if len(body) >= COMPRESSION_MIN_SIZE else None
+        if encoding == 'br':
+            body = brotli.compress(body, quality=5)
+        elif encoding == 'gzip':
+            body = gzip.compress(body, compresslevel=6)
         self.send_response(status_code)
         self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if etag:
+            # 强ETag必须区分编码
+            self.send_header('ETag', f'{etag[:-1]}-{encoding}"' if encoding else etag)
         self.send_cors_headers()
         self.end_headers()
-        self.wfile.write(response.encode('utf-8'))
+        self.wfile.write(body)
 
     def send_error_response(self, status_code, message):
         """发送错误响应"""
@@ -260,7 +578,7 @@ class MultillingualForumHandler(BaseHTTPRequestHandler):
         """发送CORS头部"""
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With, X-User-Id')
         self.send_header('Access-Control-Allow-Credentials', 'true')
 
     def log_message(self, format, *args):
@@ -271,19 +589,39 @@ def run_server():
     """启动HTTP服务器"""
     port = int(os.getenv("PORT", 3001))
     
+    data_dir = os.getenv("DATA_DIR")
+    
     logger.info("🚀 Multilingual Forum API (超轻量版) 启动中...")
-    logger.info("💾 使用内存存储")
+    persistence = None
+    if data_dir:
+        persistence = PersistenceManager(
+            posts_db,
+            data_dir,
+            fsync_interval=float(os.getenv("WAL_FSYNC_INTERVAL", "1.0")),
+            snapshot_interval=float(os.getenv("SNAPSHOT_INTERVAL", "300")),
+            snapshot_max_records=int(os.getenv("SNAPSHOT_MAX_WAL_RECORDS", "5000"))
+        )
+        persistence.load()
+        persistence.start()
+        logger.info(f"💾 使用快照+WAL持久化: {data_dir}")
+    else:
+        logger.info("💾 使用内存存储")
     logger.info("🔧 100%标准库实现，零外部依赖")
     logger.info(f"🌍 服务器启动在端口 {port}")
     logger.info("✨ 支持功能: 帖子、翻译、回复、点赞")
     
     server = HTTPServer(('0.0.0.0', port), MultillingualForumHandler)
+    # 平台重启实例时发送SIGTERM，按正常关闭流程刷盘
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
     
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         logger.info("🛑 服务器正在关闭...")
-        server.shutdown()
+    finally:
+        server.server_close()
+        if persistence:
+            persistence.close()
 
 if __name__ == "__main__":
     run_server() 
\ No newline at end of file
@@ -1,27 +1,92 @@
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+import asyncio
+import logging
+import time
 import uvicorn
 import os
 from dotenv import load_dotenv
 
 # 导入路由
 from routes.auth import router as auth_router
-from routes.posts import router as posts_router
-from routes.translate import router as translate_router
+from routes.posts import router as posts_router, like_counter
+from routes.translate import router as translate_router, translation_service
 from routes.users import router as users_router
+from routes.events import router as events_router
 from middleware.rate_limit import RateLimitMiddleware
+from middleware.compression import CompressionMiddleware
+import fast_json
+from fast_json import FastJSONResponse
+from services.inference_workers import inference_pool, parse_preload
+from services.readiness import readiness, parse_model_pairs
+from services import http_client
 
 # 加载环境变量
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+async def warm_up():
+    """启动预热：启动本地推理进程池、试翻译配置的语言对、建立到各翻译服务的连接"""
+    # 本地模型推理进程池（LOCAL_INFERENCE_WORKERS > 0 时启用）
+    inference_workers = int(os.getenv("LOCAL_INFERENCE_WORKERS", "0"))
+    if inference_workers > 0:
+        started = time.monotonic()
+        local_model_type = os.getenv("LOCAL_MODEL_TYPE", "transformers")
+        default_preload = os.getenv("LOCAL_MODEL_NAME", "") if local_model_type in ("transformers", "onnx") else ""
+        ok = await inference_pool.start(
+            inference_workers,
+            parse_preload(os.getenv("LOCAL_INFERENCE_PRELOAD", default_preload), local_model_type),
+            request_timeout=float(os.getenv("LOCAL_INFERENCE_TIMEOUT", "120")),
+            health_interval=float(os.getenv("LOCAL_INFERENCE_HEALTH_INTERVAL", "30")),
+            threads=int(os.getenv("LOCAL_INFERENCE_THREADS", "1"))
+        )
+        readiness.record("inference_workers", ok, started)
+    
+    await translation_service.warm_up(
+        parse_model_pairs(os.getenv("WARMUP_MODEL_PAIRS", "")),
+        prime_connections=os.getenv("WARMUP_PRIME_CONNECTIONS", "true").lower() == "true"
+    )
+
+async def run_warm_up():
+    """执行预热并在结束（或超时）后结束预热阶段；失败或超时的步骤使状态变为 degraded，结果见 /api/ready"""
+    started = time.monotonic()
+    try:
+        await asyncio.wait_for(warm_up(), timeout=float(os.getenv("WARMUP_TIMEOUT", "300")))
+    except asyncio.TimeoutError:
+        readiness.record("timeout", False, started, "warm-up did not finish in time")
+    except Exception as e:
+        logger.error(f"Warm-up failed: {str(e)}")
+        readiness.record("warm_up", False, started, str(e))
+    finally:
+        readiness.mark_ready()
+        if readiness.degraded:
+            failed = [step["name"] for step in readiness.steps if not step["ok"]]
+            logger.warning(f"Warm-up finished with failed steps: {', '.join(failed)}")
+        else:
+            logger.info("Warm-up finished, instance is ready")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 启动时执行
     print("🌍 Multilingual Forum server starting up...")
+    # 预热在后台进行，期间 /api/health 正常而 /api/ready 返回 503
+    readiness.begin()
+    warm_up_task = None
+    if os.getenv("WARMUP_ENABLED", "true").lower() == "true":
+        warm_up_task = asyncio.create_task(run_warm_up())
+    else:
+        readiness.mark_ready()
     yield
     # 关闭时执行
+    if warm_up_task is not None and not warm_up_task.done():
+        warm_up_task.cancel()
+    await like_counter.stop()
+    await inference_pool.shutdown()
+    await http_client.close()
     print("🌍 Multilingual Forum server shutting down...")
 
 # 创建FastAPI应用
@@ -29,7 +94,9 @@ app = FastAPI(
     title="Multilingual Forum API",
     description="AI-powered multilingual forum that breaks language barriers",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # FAST_JSON_RESPONSES=true 时使用 orjson/msgspec 序列化响应
+    **({"default_response_class": FastJSONResponse} if fast_json.is_enabled() else {})
 )
 
 # CORS配置 - 支持本地开发和Vercel部署
@@ -56,11 +123,15 @@ app.add_middleware(
 # 添加速率限制中间件
 app.add_middleware(RateLimitMiddleware)
 
+# 添加响应压缩中间件
+app.add_middleware(CompressionMiddleware)
+
 # 注册路由
 app.include_router(auth_router, prefix="/api/auth", tags=["authentication"])
 app.include_router(posts_router, prefix="/api/posts", tags=["posts"])
 app.include_router(translate_router, prefix="/api/translate", tags=["translation"])
 app.include_router(users_router, prefix="/api/users", tags=["users"])
+app.include_router(events_router, prefix="/api/events", tags=["events"])
 
 # 健康检查端点
 @app.get("/api/health")
@@ -76,6 +147,15 @@ async def health_check():
         "version": "1.0.0"
     }
 
+# 就绪检查端点
+@app.get("/api/ready")
+async def readiness_check():
+    """就绪检查端点：启动预热完成前返回503；WARMUP_REQUIRE_SUCCESS=true 时预热有失败步骤也返回503"""
+    require_success = os.getenv("WARMUP_REQUIRE_SUCCESS", "false").lower() == "true"
+    if not readiness.ready or (require_success and readiness.degraded):
+        return JSONResponse(status_code=503, content=readiness.snapshot())
+    return readiness.snapshot()
+
 # 静态文件服务（用于生产环境）
 if os.path.exists("../client/build"):
     app.mount("/static", StaticFiles(directory="../client/build/static"), name="static")
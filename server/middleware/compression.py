@@ -0,0 +1,93 @@
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # brotli为可选依赖，未安装时只使用gzip
+    brotli = None
+
+# 这些类型已压缩或是流式响应，不做处理
+SKIP_MEDIA_PREFIXES = ("image/", "video/", "audio/", "text/event-stream")
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    """解析Accept-Encoding，忽略 q=0 的编码"""
+    encodings = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        params = params.strip().replace(" ", "")
+        if not name:
+            continue
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        encodings.add(name)
+    return encodings
+
+
+class CompressionMiddleware(BaseHTTPMiddleware):
+    """响应压缩中间件，支持brotli（可选）和gzip，小于阈值的响应不压缩"""
+
+    def __init__(self, app, minimum_size: int = None, gzip_level: int = 6, brotli_quality: int = 5):
+        super().__init__(app)
+        self.minimum_size = minimum_size or int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose_encoding(self, request: Request):
+        accepted = _accepted_encodings(request.headers.get("Accept-Encoding", ""))
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted or "*" in accepted:
+            return "gzip"
+        return None
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    def _restore_encoded_etag(self, request: Request, response: Response, encoding: str):
+        """304响应沿用客户端缓存的带编码后缀的ETag"""
+        etag = response.headers.get("etag")
+        if not etag or not etag.endswith('"'):
+            return
+        encoded_etag = f'{etag[:-1]}-{encoding}"'
+        if encoded_etag in request.headers.get("If-None-Match", ""):
+            response.headers["etag"] = encoded_etag
+
+    async def dispatch(self, request: Request, call_next):
+        """压缩响应体"""
+        encoding = self._choose_encoding(request)
+        response = await call_next(request)
+        if encoding is not None and response.status_code == 304:
+            self._restore_encoded_etag(request, response, encoding)
+            return response
+        if encoding is None or response.status_code == 204 or "content-encoding" in response.headers:
+            return response
+
+        media_type = response.headers.get("content-type", "")
+        if media_type.startswith(SKIP_MEDIA_PREFIXES):
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = dict(response.headers)
+        headers.pop("content-length", None)
+        if len(body) < self.minimum_size:
+            return Response(content=body, status_code=response.status_code, headers=headers)
+
+        compressed = self._compress(body, encoding)
+        headers["content-encoding"] = encoding
+        vary = headers.get("vary")
+        headers["vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+        # 强ETag必须区分编码，加上编码后缀（比较时由 middleware.etag 去掉）
+        etag = headers.get("etag")
+        if etag and etag.endswith('"'):
+            headers["etag"] = f'{etag[:-1]}-{encoding}"'
+        return Response(content=compressed, status_code=response.status_code, headers=headers)
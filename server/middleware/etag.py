@@ -0,0 +1,45 @@
+from fastapi import Request, Response
+import hashlib
+import uuid
+
+# CompressionMiddleware 会给ETag加上的编码后缀
+ENCODING_SUFFIXES = ("-br", "-gzip")
+
+# 进程启动标识：版本号是进程内计数器，重启后从头开始，混入ETag避免与重启前的ETag相同
+BOOT_EPOCH = uuid.uuid4().hex[:8]
+
+
+def make_etag(collection: str, version: int, *variant, epoch: bool = True) -> str:
+    """根据集合版本号和启动标识生成强ETag，variant用于区分同一集合的不同表示（分页、过滤等）
+
+    版本号为常量的静态集合传 epoch=False，ETag在重启和多个工作进程之间保持不变。
+    """
+    tag = f"{collection}-{BOOT_EPOCH}-{version}" if epoch else f"{collection}-{version}"
+    if variant:
+        digest = hashlib.sha1(repr(variant).encode("utf-8")).hexdigest()[:12]
+        tag = f"{tag}-{digest}"
+    return f'"{tag}"'
+
+
+def _strip_encoding_suffix(tag: str) -> str:
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix + '"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """检查If-None-Match是否命中当前ETag"""
+    if_none_match = request.headers.get("If-None-Match")
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or _strip_encoding_suffix(candidate) == etag:
+            return True
+    return False
+
+
+def not_modified_response(etag: str) -> Response:
+    """返回304响应"""
+    return Response(status_code=304, headers={"ETag": etag})
@@ -57,7 +57,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         """处理请求的中间件方法"""
         # 跳过健康检查和静态文件
-        if request.url.path in ["/api/health", "/health"]:
+        if request.url.path in ["/api/health", "/api/ready", "/health"]:
             return await call_next(request)
         
         if request.url.path.startswith("/static/"):
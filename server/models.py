@@ -39,6 +39,7 @@ class TranslationService(str, Enum):
     GOOGLE = "google"
     DEEPL = "deepl"
     LOCAL = "local"
+    AUTO = "auto"  # 按语言对的历史延迟和成功率自动选择
 
 # 用户相关模型
 class UserCreate(BaseModel):
@@ -59,6 +60,11 @@ class UserLogin(BaseModel):
 class UserPreferences(BaseModel):
     preferred_language: LanguageCode
 
+class UsersResponse(BaseModel):
+    users: List[UserResponse]
+    next_cursor: Optional[str] = None
+    total: int
+
 # 帖子相关模型
 class ReplyCreate(BaseModel):
     content: str
@@ -87,7 +93,9 @@ class PostResponse(BaseModel):
     language: str
     timestamp: str
     likes: int = 0
-    replies: List[ReplyResponse] = []
+    # 回复通过 GET /api/posts/{id}/replies 分页获取
+    reply_count: int = 0
+    last_reply_at: Optional[str] = None
 
 class PostUpdate(BaseModel):
     title: Optional[str] = None
@@ -108,6 +116,15 @@ class TranslationResponse(BaseModel):
     service: str
     detected_language: Optional[str] = None
 
+class BatchTranslationRequest(BaseModel):
+    texts: List[str]
+    target_lang: LanguageCode
+    source_lang: Optional[LanguageCode] = None
+    service: TranslationService = TranslationService.OPENAI
+
+class BatchTranslationResponse(BaseModel):
+    translations: List[TranslationResponse]
+
 # 分页模型
 class PaginationParams(BaseModel):
     page: int = 1
@@ -125,6 +142,16 @@ class PostsResponse(BaseModel):
     posts: List[PostResponse]
     pagination: PaginationResponse
 
+class RepliesResponse(BaseModel):
+    replies: List[ReplyResponse]
+    next_cursor: Optional[str] = None
+    reply_count: int
+
+class SearchResponse(BaseModel):
+    query: str
+    posts: List[PostResponse]
+    pagination: PaginationResponse
+
 # 统计模型
 class ForumStats(BaseModel):
     total_posts: int
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import asyncio
+import logging
+import os
+from services.event_broadcaster import broadcaster, parse_languages
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# 空闲连接的心跳间隔（秒），防止代理因超时断开
+HEARTBEAT_INTERVAL = float(os.getenv("EVENT_HEARTBEAT_INTERVAL", "25"))
+
+@router.get("/stream")
+async def stream_events(request: Request, language: Optional[str] = None):
+    """订阅论坛事件（Server-Sent Events），language 为逗号分隔的语言过滤"""
+    subscription = broadcaster.subscribe(parse_languages(language))
+    
+    async def event_stream():
+        try:
+            yield "retry: 5000\n: connected\n\n"
+            while True:
+                event = await subscription.get(timeout=HEARTBEAT_INTERVAL)
+                if event is None:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                yield event.sse
+        except ConnectionResetError:
+            yield "event: dropped\ndata: {}\n\n"
+        finally:
+            broadcaster.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/ws")
+async def websocket_events(websocket: WebSocket, language: Optional[str] = None):
+    """订阅论坛事件（WebSocket），language 为逗号分隔的语言过滤"""
+    await websocket.accept()
+    subscription = broadcaster.subscribe(parse_languages(language))
+    
+    async def forward():
+        while True:
+            event = await subscription.get(timeout=HEARTBEAT_INTERVAL)
+            await websocket.send_text(event.json if event else '{"type": "ping"}')
+    
+    sender = asyncio.create_task(forward())
+    try:
+        # 客户端消息只用于检测断开
+        while True:
+            receiver = asyncio.create_task(websocket.receive_text())
+            done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                receiver.result()
+            else:
+                receiver.cancel()
+                sender.result()
+    except ConnectionResetError:
+        await websocket.close(code=1013, reason="Event queue overflowed")
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.warning(f"Event WebSocket closed with error: {str(e)}")
+    finally:
+        sender.cancel()
+        broadcaster.unsubscribe(subscription)
+
+@router.get("/stats")
+async def get_event_stats():
+    """获取事件订阅者数量和发布统计"""
+    return broadcaster.stats()
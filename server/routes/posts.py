@@ -1,64 +1,233 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
-from datetime import datetime
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import os
 import uuid
 from models import (
     PostCreate, PostResponse, PostUpdate, ReplyCreate, ReplyResponse,
-    LikeAction, PostsResponse, PaginationResponse, ForumStats
+    LikeAction, PostsResponse, PaginationResponse, ForumStats, SearchResponse,
+    RepliesResponse
 )
+from middleware.etag import BOOT_EPOCH, make_etag, is_not_modified, not_modified_response
+import fast_json
+from fast_json import RawJSONResponse, dumps
+from services.forum_stats import ForumStatsTracker
+from services.search_index import SearchIndex, merge_results
+from services.change_log import ChangeLog, compact_changes
+from services.like_counter import LikeCounter
+from services.reply_store import ReplyStore
+from services.excerpt import make_excerpt
+from services.records import PostRecord, ReplyRecord, parse_id, to_epoch_ms, to_iso
+from services.id_generator import id_generator, timestamp_of
+from services.language_detect import detect_language, MIN_CONFIDENCE
+from services.event_broadcaster import broadcaster
+from routes.translate import translation_service
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 # 内存存储（演示用，生产环境建议使用数据库）
-posts_db = [
-    {
-        "id": "1",
-        "title": "Welcome to the Multilingual Forum!",
-        "content": "This is a revolutionary platform where people from all over the world can communicate without language barriers. Post in your native language and read in your preferred language!",
-        "author": "Admin",
-        "language": "en",
-        "timestamp": "2024-01-01T12:00:00Z",
-        "likes": 15,
-        "replies": []
-    },
-    {
-        "id": "2",
-        "title": "Bonjour le monde!",
-        "content": "Je suis très excité de pouvoir communiquer avec des gens du monde entier. Cette technologie va vraiment changer la façon dont nous interagissons en ligne.",
-        "author": "Pierre",
-        "language": "fr",
-        "timestamp": "2024-01-02T10:30:00Z",
-        "likes": 8,
-        "replies": []
-    },
-    {
-        "id": "3",
-        "title": "¡Hola comunidad!",
-        "content": "Estoy impresionado por esta plataforma. Finalmente podemos romper las barreras del idioma y conectar con personas de todo el mundo de manera más efectiva.",
-        "author": "María",
-        "language": "es",
-        "timestamp": "2024-01-02T14:15:00Z",
-        "likes": 12,
-        "replies": []
-    }
+posts_db: List[PostRecord] = [
+    PostRecord(
+        id=1,
+        title="Welcome to the Multilingual Forum!",
+        content="This is a revolutionary platform where people from all over the world can communicate without language barriers. Post in your native language and read in your preferred language!",
+        author="Admin",
+        language="en",
+        created_at=to_epoch_ms("2024-01-01T12:00:00Z"),
+        likes=15
+    ),
+    PostRecord(
+        id=2,
+        title="Bonjour le monde!",
+        content="Je suis très excité de pouvoir communiquer avec des gens du monde entier. Cette technologie va vraiment changer la façon dont nous interagissons en ligne.",
+        author="Pierre",
+        language="fr",
+        created_at=to_epoch_ms("2024-01-02T10:30:00Z"),
+        likes=8
+    ),
+    PostRecord(
+        id=3,
+        title="¡Hola comunidad!",
+        content="Estoy impresionado por esta plataforma. Finalmente podemos romper las barreras del idioma y conectar con personas de todo el mundo de manera más efectiva.",
+        author="María",
+        language="es",
+        created_at=to_epoch_ms("2024-01-02T14:15:00Z"),
+        likes=12
+    )
 ]
 
-next_post_id = 4
+# 回复与帖子分开保存，帖子上只保留 reply_count / last_reply_at
+reply_store = ReplyStore()
+
+# 增量维护的统计信息
+forum_stats = ForumStatsTracker()
+forum_stats.rebuild(posts_db)
+
+# 全文检索倒排索引，随创建/回复/删除增量更新
+search_index = SearchIndex()
+
+def _index_fields(post: PostRecord) -> Dict[str, str]:
+    return {"title": post.title, "content": post.content, "author": post.author}
+
+# 原文 -> [(帖子ID, 字段)]，用于把翻译服务产出的译文归属到帖子；
+# 列表页翻译的是摘要，摘要与正文不同时也登记为正文字段的原文
+_text_owners: Dict[str, List[Tuple[int, str]]] = {}
+
+def _track_text(post_id: int, field: str, text: str):
+    _text_owners.setdefault(text, []).append((post_id, field))
+
+def _untrack_post(post: PostRecord):
+    texts = {post.title, post.content, post.excerpt} | {reply.content for reply in reply_store.all(post.id)}
+    for text in texts:
+        owners = [owner for owner in _text_owners.get(text, []) if owner[0] != post.id]
+        if owners:
+            _text_owners[text] = owners
+        else:
+            _text_owners.pop(text, None)
+
+def _index_post(post: PostRecord):
+    search_index.add(post.id, _index_fields(post), post.language)
+    _track_text(post.id, "title", post.title)
+    _track_text(post.id, "content", post.content)
+    if post.excerpt and post.excerpt != post.content:
+        _track_text(post.id, "content", post.excerpt)
+    for reply in reply_store.all(post.id):
+        search_index.append(post.id, "reply", reply.content)
+        _track_text(post.id, "reply", reply.content)
+
+def _ingest_translation(text: str, result: dict, target_lang: str):
+    """翻译服务产出帖子译文时，按目标语言写入检索索引"""
+    for post_id, field in _text_owners.get(text, ()):
+        search_index.add_translation(post_id, target_lang, field, text, result["translated_text"])
+
+for _post in posts_db:
+    _post.excerpt = make_excerpt(_post.content)
+    _index_post(_post)
+
+translation_service.add_listener(_ingest_translation)
+
+# 变更日志：创建/点赞/回复/删除时递增版本号，用于生成ETag和增量同步
+change_log = ChangeLog(int(os.getenv("CHANGE_LOG_SIZE", "1000")), epoch=BOOT_EPOCH)
+
+# 帖子序列化缓存：post_id -> JSON字节串，帖子变更时失效
+_post_json_cache: Dict[int, bytes] = {}
+_summary_json_cache: Dict[int, bytes] = {}
+
+# 列表摘要视图（view=summary）返回的字段，excerpt 在写入时预先生成
+SUMMARY_FIELDS = (
+    "id", "title", "excerpt", "author", "language", "timestamp",
+    "likes", "reply_count", "last_reply_at"
+)
+PROJECTABLE_FIELDS = set(PostResponse.model_fields) | {"excerpt"}
+
+def _find_post(post_id: str) -> Optional[PostRecord]:
+    record_id = parse_id(post_id)
+    return next((post for post in posts_db if post.id == record_id), None)
+
+def _record_change(change_type: str, post_id: int, data: dict, language: str):
+    """记录一次写操作：写入变更日志（递增版本号）、使帖子的序列化缓存失效并推送事件"""
+    version = change_log.record(change_type, str(post_id), data)
+    _post_json_cache.pop(post_id, None)
+    _summary_json_cache.pop(post_id, None)
+    broadcaster.publish(change_type, data, language, event_id=version)
+
+def _post_api(post: PostRecord) -> dict:
+    """转换为接口格式，并叠加尚未写回的点赞增量"""
+    data = post.to_api()
+    pending = like_counter.pending(post.id)
+    if pending:
+        data["likes"] = max(0, post.likes + pending)
+    return data
+
+def _post_response(post: PostRecord) -> PostResponse:
+    return PostResponse(**_post_api(post))
+
+def _post_json(post: PostRecord) -> bytes:
+    """获取帖子的预序列化JSON（只在首次或变更后校验并序列化一次）"""
+    if like_counter.pending(post.id):
+        return dumps(_post_response(post).model_dump())
+    cached = _post_json_cache.get(post.id)
+    if cached is None:
+        cached = dumps(PostResponse(**post.to_api()).model_dump())
+        _post_json_cache[post.id] = cached
+    return cached
+
+def _parse_projection(view: Optional[str], fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """解析列表视图参数，返回要输出的字段；完整视图返回None"""
+    if fields:
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in names if name not in PROJECTABLE_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        # id 始终返回，客户端需要用它定位帖子
+        return tuple(dict.fromkeys(["id"] + names))
+    if view is None or view == "full":
+        return None
+    if view == "summary":
+        return SUMMARY_FIELDS
+    raise HTTPException(status_code=400, detail="Invalid view. Use 'full' or 'summary'")
+
+def _post_projection_json(post: PostRecord, fields: Tuple[str, ...]) -> bytes:
+    """只序列化指定字段；摘要视图的结果按帖子缓存"""
+    if fields is SUMMARY_FIELDS and not like_counter.pending(post.id):
+        cached = _summary_json_cache.get(post.id)
+        if cached is None:
+            data = post.to_api()
+            cached = dumps({field: data[field] for field in fields})
+            _summary_json_cache[post.id] = cached
+        return cached
+    data = _post_api(post)
+    return dumps({field: data[field] for field in fields})
+
+def _apply_like_deltas(deltas: Dict[int, int]):
+    """把一批点赞增量写回帖子，每个帖子只记录一次变更"""
+    posts_by_id = {post.id: post for post in posts_db if post.id in deltas}
+    for post_id, delta in deltas.items():
+        post = posts_by_id.get(post_id)
+        if post is None:
+            continue
+        likes = max(0, post.likes + delta)
+        forum_stats.likes_changed(likes - post.likes)
+        post.likes = likes
+        _record_change("post_liked", post_id, {"post_id": str(post_id), "likes": likes}, post.language)
+
+# 写回式点赞计数，按 LIKE_FLUSH_INTERVAL 秒批量写回帖子
+like_counter = LikeCounter(
+    shards=int(os.getenv("LIKE_COUNTER_SHARDS", "8")),
+    flush_interval=float(os.getenv("LIKE_FLUSH_INTERVAL", "1.0"))
+)
+like_counter.bind(_apply_like_deltas)
 
 @router.get("/", response_model=PostsResponse)
 async def get_posts(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=50),
-    language: Optional[str] = None
+    language: Optional[str] = None,
+    view: Optional[str] = None,
+    fields: Optional[str] = None
 ):
-    """获取帖子列表"""
+    """获取帖子列表
+    
+    view=summary 时只返回标题、摘要、计数和元数据；fields=a,b,c 只返回指定字段（总是包含 id）。
+    """
+    projection = _parse_projection(view, fields)
+    etag = make_etag("posts", change_log.version, forum_stats.generation, page, limit, language, projection)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
+    
     # 按语言过滤
     filtered_posts = posts_db
     if language:
-        filtered_posts = [post for post in posts_db if post["language"] == language]
+        filtered_posts = [post for post in posts_db if post.language == language]
     
-    # 按时间戳排序（最新的在前）
-    filtered_posts.sort(key=lambda x: x["timestamp"], reverse=True)
+    # 按ID排序（ID随创建时间递增，最新的在前）
+    filtered_posts.sort(key=lambda x: x.id, reverse=True)
     
     # 分页计算
     total_posts = len(filtered_posts)
@@ -76,25 +245,140 @@ async def get_posts(
         has_prev=start_index > 0
     )
     
+    if projection is not None:
+        body = (
+            b'{"posts":[' + b",".join(_post_projection_json(post, projection) for post in paginated_posts)
+            + b'],"pagination":' + dumps(pagination.model_dump()) + b"}"
+        )
+        return RawJSONResponse(body, headers={"ETag": etag})
+    
+    if fast_json.is_enabled():
+        # 快速路径：直接拼接缓存的帖子JSON，跳过逐个构造和校验Pydantic对象
+        body = (
+            b'{"posts":[' + b",".join(_post_json(post) for post in paginated_posts)
+            + b'],"pagination":' + dumps(pagination.model_dump()) + b"}"
+        )
+        return RawJSONResponse(body, headers={"ETag": etag})
+    
     return PostsResponse(
-        posts=[PostResponse(**post) for post in paginated_posts],
+        posts=[_post_response(post) for post in paginated_posts],
         pagination=pagination
     )
 
+async def _translate_query(q: str) -> List[str]:
+    """把检索词翻译为论坛最常用的几种语言，超时未完成的语言跳过
+    
+    本地识别的语言只用于跳过与检索词相同的语言，源语言交给翻译服务自行识别。
+    """
+    detected, confidence = detect_language(q)
+    source_lang = detected if detected and confidence >= MIN_CONFIDENCE else "auto"
+    targets = [
+        lang for lang in forum_stats.top_languages(int(os.getenv("SEARCH_QUERY_LANGUAGES", "3")))
+        if lang != source_lang
+    ]
+    if not targets:
+        return []
+    
+    service = os.getenv("SEARCH_TRANSLATION_SERVICE", "auto")
+    tasks = [
+        asyncio.create_task(translation_service.translate(q, lang, "auto", service))
+        for lang in targets
+    ]
+    done, pending = await asyncio.wait(tasks, timeout=float(os.getenv("SEARCH_QUERY_TRANSLATION_TIMEOUT", "1.0")))
+    for task in pending:
+        task.cancel()
+    
+    translations = []
+    for task in done:
+        if task.exception() is not None:
+            logger.warning(f"Query translation failed: {task.exception()}")
+        elif task.result()["translated_text"] != q:
+            translations.append(task.result()["translated_text"])
+    return translations
+
+@router.get("/search", response_model=SearchResponse)
+async def search_posts(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, ge=1, le=50),
+    language: Optional[str] = None,
+    cross_lingual: bool = False
+):
+    """全文检索帖子（标题、内容、作者、回复及已缓存的译文），按 BM25 相关度排序
+    
+    cross_lingual=true 时先把检索词翻译为论坛最常用的几种语言，再合并各语言的检索结果。
+    """
+    etag = make_etag("search", change_log.version, forum_stats.generation, search_index.generation, q, page, limit, language, cross_lingual)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
+    queries = [q]
+    if cross_lingual:
+        queries.extend(await _translate_query(q))
+    hits = merge_results(search_index.search(query, language) for query in queries)
+    # 翻译检索词时可能收录了新的译文，按检索前的版本返回ETag会导致缓存错误
+    etag = make_etag("search", change_log.version, forum_stats.generation, search_index.generation, q, page, limit, language, cross_lingual)
+    response.headers["ETag"] = etag
+    total_posts = len(hits)
+    start_index = (page - 1) * limit
+    end_index = start_index + limit
+    page_ids = [doc_id for doc_id, _ in hits[start_index:end_index]]
+    wanted = set(page_ids)
+    posts_by_id = {post.id: post for post in posts_db if post.id in wanted}
+    
+    return SearchResponse(
+        query=q,
+        posts=[_post_response(posts_by_id[doc_id]) for doc_id in page_ids if doc_id in posts_by_id],
+        pagination=PaginationResponse(
+            current_page=page,
+            total_pages=(total_posts + limit - 1) // limit,
+            total_posts=total_posts,
+            has_next=end_index < total_posts,
+            has_prev=start_index > 0
+        )
+    )
+
+@router.get("/changes")
+async def get_changes(since: int = Query(..., ge=0), epoch: Optional[str] = None):
+    """增量同步：返回 since 版本之后的帖子变更（已合并冗余变更）
+    
+    epoch 与本进程不一致（服务重启后版本号重新计数）、未提供、或 since 早于保留窗口时返回 resync=true，
+    客户端应重新拉取帖子列表，并记录响应中新的 epoch 和 version。
+    """
+    changes = change_log.since(since, epoch)
+    if changes is None:
+        return {"epoch": change_log.epoch, "version": change_log.version, "resync": True, "changes": []}
+    return {
+        "epoch": change_log.epoch,
+        "version": change_log.version,
+        "resync": False,
+        "changes": [
+            {"version": change["version"], "type": change["type"], "post_id": change["post_id"], "data": change["data"]}
+            for change in compact_changes(changes)
+        ]
+    }
+
 @router.get("/{post_id}", response_model=PostResponse)
-async def get_post(post_id: str):
+async def get_post(post_id: str, request: Request, response: Response):
     """获取特定帖子"""
-    post = next((post for post in posts_db if post["id"] == post_id), None)
+    post = _find_post(post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    return PostResponse(**post)
+    etag = make_etag("posts", change_log.version, forum_stats.generation, post_id)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    if fast_json.is_enabled():
+        return RawJSONResponse(_post_json(post), headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
+    return _post_response(post)
 
 @router.post("/", response_model=PostResponse)
 async def create_post(post: PostCreate):
     """创建新帖子"""
-    global next_post_id
-    
     if not post.title.strip() or not post.content.strip() or not post.author.strip():
         raise HTTPException(status_code=400, detail="Missing required fields: title, content, author")
     
@@ -104,42 +388,58 @@ async def create_post(post: PostCreate):
     if len(post.content) > 5000:
         raise HTTPException(status_code=400, detail="Content too long. Maximum 5000 characters allowed.")
     
-    new_post = {
-        "id": str(next_post_id),
-        "title": post.title.strip(),
-        "content": post.content.strip(),
-        "author": post.author.strip(),
-        "language": post.language.value,
-        "timestamp": datetime.utcnow().isoformat() + "Z",
-        "likes": 0,
-        "replies": []
-    }
+    post_id = id_generator.next_id()
+    content = post.content.strip()
+    new_post = PostRecord(
+        id=post_id,
+        title=post.title.strip(),
+        content=content,
+        author=post.author.strip(),
+        language=post.language.value,
+        created_at=timestamp_of(post_id),
+        excerpt=make_excerpt(content)
+    )
     
     posts_db.insert(0, new_post)  # 添加到开头
-    next_post_id += 1
+    forum_stats.post_created(new_post)
+    _index_post(new_post)
     
-    return PostResponse(**new_post)
+    response = PostResponse(**new_post.to_api())
+    _record_change("post_created", new_post.id, response.model_dump(), new_post.language)
+    return response
 
 @router.put("/{post_id}/like")
-async def like_post(post_id: str, action: LikeAction):
-    """点赞/取消点赞帖子"""
-    post = next((post for post in posts_db if post["id"] == post_id), None)
+async def like_post(post_id: str, action: LikeAction, x_user_id: Optional[str] = Header(None)):
+    """点赞/取消点赞帖子
+    
+    点赞先累加到内存计数器，定期批量写回帖子；带 X-User-Id 时按用户去重。
+    """
+    post = _find_post(post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    if action.action == "like":
-        post["likes"] += 1
-    elif action.action == "unlike" and post["likes"] > 0:
-        post["likes"] -= 1
-    else:
+    current_likes = post.likes + like_counter.pending(post.id)
+    if action.action not in ("like", "unlike"):
         raise HTTPException(status_code=400, detail="Invalid action. Use 'like' or 'unlike'")
     
-    return {"likes": post["likes"]}
+    if x_user_id:
+        # 重复点赞或未点赞时取消均不改变计数
+        like_counter.toggle(post.id, x_user_id, action.action == "like")
+        return {
+            "likes": max(0, post.likes + like_counter.pending(post.id)),
+            "liked": like_counter.has_liked(post.id, x_user_id)
+        }
+    
+    if action.action == "unlike" and current_likes <= 0:
+        raise HTTPException(status_code=400, detail="Invalid action. Use 'like' or 'unlike'")
+    like_counter.add(post.id, 1 if action.action == "like" else -1)
+    
+    return {"likes": current_likes + (1 if action.action == "like" else -1)}
 
 @router.post("/{post_id}/reply", response_model=ReplyResponse)
 async def add_reply(post_id: str, reply: ReplyCreate):
     """添加回复"""
-    post = next((post for post in posts_db if post["id"] == post_id), None)
+    post = _find_post(post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
@@ -149,54 +449,114 @@ async def add_reply(post_id: str, reply: ReplyCreate):
     if len(reply.content) > 2000:
         raise HTTPException(status_code=400, detail="Reply too long. Maximum 2000 characters allowed.")
     
-    new_reply = {
-        "id": str(int(datetime.utcnow().timestamp() * 1000)),  # 简单的ID生成
-        "content": reply.content.strip(),
-        "author": reply.author.strip(),
-        "language": reply.language.value,
-        "timestamp": datetime.utcnow().isoformat() + "Z",
-        "likes": 0
-    }
+    reply_id = id_generator.next_id()
+    new_reply = ReplyRecord(
+        id=reply_id,
+        content=reply.content.strip(),
+        author=reply.author.strip(),
+        language=reply.language.value,
+        created_at=timestamp_of(reply_id)
+    )
+    
+    reply_store.add(post.id, new_reply)
+    post.reply_count += 1
+    post.last_reply_at = new_reply.created_at
+    forum_stats.reply_added()
+    search_index.append(post.id, "reply", new_reply.content)
+    _track_text(post.id, "reply", new_reply.content)
+    
+    response = ReplyResponse(**new_reply.to_api())
+    _record_change("reply_created", post.id, {"post_id": str(post.id), "reply": response.model_dump()}, new_reply.language)
+    return response
+
+@router.get("/{post_id}/replies", response_model=RepliesResponse)
+async def get_replies(
+    post_id: str,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100)
+):
+    """按时间正序分页获取帖子的回复，cursor 为上一页返回的 next_cursor"""
+    post = _find_post(post_id)
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
     
-    post["replies"].append(new_reply)
+    etag = make_etag("replies", post_id, post.reply_count, cursor, limit)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
     
-    return ReplyResponse(**new_reply)
+    try:
+        replies, next_cursor = reply_store.page(post.id, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    return RepliesResponse(
+        replies=[ReplyResponse(**reply.to_api()) for reply in replies],
+        next_cursor=next_cursor,
+        reply_count=post.reply_count
+    )
 
 @router.delete("/{post_id}")
 async def delete_post(post_id: str):
     """删除帖子（管理员功能）"""
     global posts_db
     
-    post_index = next((i for i, post in enumerate(posts_db) if post["id"] == post_id), None)
+    record_id = parse_id(post_id)
+    post_index = next((i for i, post in enumerate(posts_db) if post.id == record_id), None)
     if post_index is None:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    posts_db.pop(post_index)
+    deleted_post = posts_db.pop(post_index)
+    forum_stats.post_deleted(deleted_post)
+    search_index.remove(record_id)
+    like_counter.forget(record_id)
+    _untrack_post(deleted_post)
+    reply_store.remove_post(record_id)
+    _record_change("post_deleted", record_id, {"post_id": post_id}, deleted_post.language)
     
     return {"message": "Post deleted successfully"}
 
 @router.get("/stats/summary", response_model=ForumStats)
-async def get_forum_stats():
+async def get_forum_stats(request: Request, response: Response):
     """获取论坛统计信息"""
-    total_posts = len(posts_db)
-    total_replies = sum(len(post["replies"]) for post in posts_db)
-    total_likes = sum(post["likes"] for post in posts_db)
-    languages_used = len(set(post["language"] for post in posts_db))
+    etag = make_etag("stats", change_log.version, forum_stats.generation)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
     
     recent_activity = [
         {
-            "id": post["id"],
-            "title": post["title"],
-            "author": post["author"],
-            "timestamp": post["timestamp"]
+            "id": str(post.id),
+            "title": post.title,
+            "author": post.author,
+            "timestamp": to_iso(post.created_at)
         }
         for post in posts_db[:5]
     ]
     
     return ForumStats(
-        total_posts=total_posts,
-        total_replies=total_replies,
-        total_likes=total_likes,
-        languages_used=languages_used,
+        total_posts=forum_stats.total_posts,
+        total_replies=forum_stats.total_replies,
+        total_likes=forum_stats.total_likes,
+        languages_used=forum_stats.languages_used,
         recent_activity=recent_activity
-    ) 
\ No newline at end of file
+    )
+
+@router.get("/stats/check")
+async def check_forum_stats():
+    """校验增量统计与全量计算是否一致（管理员功能，只读）"""
+    differences = forum_stats.check(posts_db, reply_store.count)
+    return {"consistent": not differences, "differences": differences}
+
+@router.post("/stats/repair")
+async def repair_forum_stats():
+    """发现不一致时按帖子和回复存储重建统计（管理员功能）"""
+    differences = forum_stats.check(posts_db, reply_store.count)
+    if differences:
+        forum_stats.repair(posts_db, reply_store.count)
+        for post_id in differences.get("post_reply_counts", {}):
+            _post_json_cache.pop(int(post_id), None)
+            _summary_json_cache.pop(int(post_id), None)
+    return {"consistent": not differences, "differences": differences, "repaired": bool(differences)} 
\ No newline at end of file
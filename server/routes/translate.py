@@ -1,10 +1,26 @@
-from fastapi import APIRouter, HTTPException
-import httpx
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+import json
 import os
-from typing import Dict, Any
-from models import TranslationRequest, TranslationResponse, LanguageCode
+from typing import Dict, Any, AsyncIterator, Callable, List
+from models import (
+    TranslationRequest, TranslationResponse, LanguageCode,
+    BatchTranslationRequest, BatchTranslationResponse
+)
+from middleware.etag import make_etag, is_not_modified, not_modified_response
+from services.language_detect import detect_language, MIN_CONFIDENCE
+from services.segmenter import segment_text, adapt_separator, chunk_text, estimate_tokens
+from services.translation_memory import TranslationMemory
+from services.prompt_packing import pack_texts, build_packed_messages, parse_packed_output
+from services.provider_scheduler import ProviderScheduler, ProviderRateLimited, parse_retry_after
+from services.provider_router import ProviderRouter
+from services.local_models import model_registry
+from services.inference_workers import inference_pool
+from services.http_client import pooled_client, prime
+from services.readiness import readiness
 import asyncio
 import logging
+import time
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -12,6 +28,40 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# 语言列表是静态的，修改列表时递增版本号
+LANGUAGES_VERSION = 1
+
+# 各翻译服务单次请求的输入token上限，超过时按句子边界分块并发翻译
+CHUNK_TOKEN_LIMITS = {
+    "openai": 800,
+    "azure": 2000,
+    "google": 2000,
+    "deepl": 2000,
+    "local": 400  # MarianMT 模型最大长度为512个token
+}
+
+# 启动预热时建立连接的各服务地址
+PROVIDER_BASE_URLS = {
+    "openai": "https://api.openai.com/v1/models",
+    "azure": "https://api.cognitive.microsofttranslator.com/languages?api-version=3.0",
+    "google": "https://translation.googleapis.com/language/translate/v2/languages",
+    "deepl": "https://api-free.deepl.com/v2/usage"
+}
+
+# 预热试翻译使用的短句，未列出的语言使用英文
+WARMUP_SAMPLES = {
+    "en": "Hello, welcome to the forum.",
+    "zh": "你好，欢迎来到论坛。",
+    "ja": "こんにちは、フォーラムへようこそ。",
+    "ko": "안녕하세요, 포럼에 오신 것을 환영합니다.",
+    "es": "Hola, bienvenido al foro.",
+    "fr": "Bonjour, bienvenue sur le forum.",
+    "de": "Hallo, willkommen im Forum."
+}
+
+class LocalModelUnavailable(Exception):
+    """本地推理依赖未安装，由 _call_service 在释放本地服务的准入名额后改用云端服务"""
+
 class TranslationService:
     """翻译服务类，支持多个翻译提供商"""
     
@@ -23,6 +73,52 @@ class TranslationService:
             "deepl": self._translate_with_deepl,
             "local": self._translate_with_local_model
         }
+        # 片段级翻译记忆，TRANSLATION_MEMORY_SIZE=0 时关闭
+        self.memory = TranslationMemory(int(os.getenv("TRANSLATION_MEMORY_SIZE", "50000")))
+        # 长文本分块翻译时单个请求内的最大并发数
+        self.chunk_concurrency = int(os.getenv("TRANSLATION_CHUNK_CONCURRENCY", "4"))
+        # 按服务限制并发数和字符配额
+        self.scheduler = ProviderScheduler()
+        # auto 模式下按语言对的历史延迟和成功率选择服务
+        self.router = ProviderRouter(
+            exploration_rate=float(os.getenv("ROUTING_EXPLORATION_RATE", "0.05")),
+            stale_after=float(os.getenv("ROUTING_STATS_TTL", "600"))
+        )
+        # 翻译完成回调 (原文, 翻译结果, 目标语言)，例如把帖子译文写入检索索引
+        self.listeners: List[Callable[[str, Dict[str, Any], str], None]] = []
+    
+    def add_listener(self, listener: Callable[[str, Dict[str, Any], str], None]):
+        self.listeners.append(listener)
+    
+    def _notify(self, text: str, result: Dict[str, Any], target_lang: str):
+        """把成功的翻译结果通知给回调；未翻译或降级返回原文的结果不通知"""
+        if result["service"] == "none" or result["service"].endswith("_fallback"):
+            return
+        for listener in self.listeners:
+            try:
+                listener(text, result, target_lang)
+            except Exception as e:
+                logger.error(f"Translation listener failed: {str(e)}")
+    
+    def _openai_payload(self, text: str, target_lang: str, stream: bool = False) -> Dict[str, Any]:
+        """构造OpenAI翻译请求体"""
+        return {
+            "model": "gpt-3.5-turbo",
+            "messages": [
+                {
+                    "role": "system",
+                    "content": f"You are a professional translator. Translate the following text to {target_lang}. Maintain the original tone and context. Only return the translated text, no explanations."
+                },
+                {
+                    "role": "user",
+                    "content": text
+                }
+            ],
+            # 译文可能比原文长（如英译中按字计token），按输入长度放宽输出上限
+            "max_tokens": min(4096, max(256, estimate_tokens(text) * 2 + 64)),
+            "temperature": 0.3,
+            "stream": stream
+        }
     
     async def _translate_with_openai(self, text: str, target_lang: str, source_lang: str = "auto") -> Dict[str, Any]:
         """使用OpenAI进行翻译"""
@@ -31,30 +127,19 @@ class TranslationService:
             raise HTTPException(status_code=500, detail="OpenAI API key not configured")
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with pooled_client(timeout=30.0) as client:
                 response = await client.post(
                     "https://api.openai.com/v1/chat/completions",
                     headers={
                         "Authorization": f"Bearer {api_key}",
                         "Content-Type": "application/json"
                     },
-                    json={
-                        "model": "gpt-3.5-turbo",
-                        "messages": [
-                            {
-                                "role": "system",
-                                "content": f"You are a professional translator. Translate the following text to {target_lang}. Maintain the original tone and context. Only return the translated text, no explanations."
-                            },
-                            {
-                                "role": "user",
-                                "content": text
-                            }
-                        ],
-                        "max_tokens": 1000,
-                        "temperature": 0.3
-                    }
+                    json=self._openai_payload(text, target_lang)
                 )
                 
+                if response.status_code == 429:
+                    raise ProviderRateLimited("openai", parse_retry_after(response.headers.get("Retry-After")))
+                
                 if response.status_code == 200:
                     data = response.json()
                     translated_text = data["choices"][0]["message"]["content"].strip()
@@ -67,6 +152,8 @@ class TranslationService:
                     error_data = response.json()
                     raise Exception(f"OpenAI API error: {error_data.get('error', {}).get('message', 'Unknown error')}")
                     
+        except ProviderRateLimited:
+            raise
         except Exception as e:
             logger.error(f"OpenAI translation failed: {str(e)}")
             raise Exception(f"OpenAI translation failed: {str(e)}")
@@ -87,7 +174,7 @@ class TranslationService:
             if source_lang != "auto":
                 params["from"] = source_lang
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with pooled_client(timeout=30.0) as client:
                 response = await client.post(
                     "https://api.cognitive.microsofttranslator.com/translate",
                     headers={
@@ -99,6 +186,9 @@ class TranslationService:
                     json=[{"text": text}]
                 )
                 
+                if response.status_code == 429:
+                    raise ProviderRateLimited("azure", parse_retry_after(response.headers.get("Retry-After")))
+                
                 if response.status_code == 200:
                     data = response.json()
                     result = data[0]
@@ -111,6 +201,8 @@ class TranslationService:
                     error_data = response.json()
                     raise Exception(f"Azure translation failed: {error_data.get('error', {}).get('message', 'Unknown error')}")
                     
+        except ProviderRateLimited:
+            raise
         except Exception as e:
             logger.error(f"Azure translation failed: {str(e)}")
             raise Exception(f"Azure translation failed: {str(e)}")
@@ -129,7 +221,7 @@ class TranslationService:
             if source_lang != "auto":
                 data["source"] = source_lang
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with pooled_client(timeout=30.0) as client:
                 response = await client.post(
                     "https://translation.googleapis.com/language/translate/v2",
                     headers={"Content-Type": "application/json"},
@@ -137,6 +229,9 @@ class TranslationService:
                     json=data
                 )
                 
+                if response.status_code == 429:
+                    raise ProviderRateLimited("google", parse_retry_after(response.headers.get("Retry-After")))
+                
                 if response.status_code == 200:
                     data = response.json()
                     result = data["data"]["translations"][0]
@@ -149,6 +244,8 @@ class TranslationService:
                     error_data = response.json()
                     raise Exception(f"Google translation failed: {error_data.get('error', {}).get('message', 'Unknown error')}")
                     
+        except ProviderRateLimited:
+            raise
         except Exception as e:
             logger.error(f"Google translation failed: {str(e)}")
             raise Exception(f"Google translation failed: {str(e)}")
@@ -167,7 +264,7 @@ class TranslationService:
             if source_lang != "auto":
                 data["source_lang"] = source_lang.upper()
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with pooled_client(timeout=30.0) as client:
                 response = await client.post(
                     "https://api-free.deepl.com/v2/translate",
                     headers={
@@ -177,6 +274,9 @@ class TranslationService:
                     json=data
                 )
                 
+                if response.status_code == 429:
+                    raise ProviderRateLimited("deepl", parse_retry_after(response.headers.get("Retry-After")))
+                
                 if response.status_code == 200:
                     data = response.json()
                     result = data["translations"][0]
@@ -189,18 +289,244 @@ class TranslationService:
                     error_data = response.json()
                     raise Exception(f"DeepL translation failed: {error_data.get('message', 'Unknown error')}")
                     
+        except ProviderRateLimited:
+            raise
         except Exception as e:
             logger.error(f"DeepL translation failed: {str(e)}")
             raise Exception(f"DeepL translation failed: {str(e)}")
     
+    async def warm_up(self, model_pairs: List[tuple], prime_connections: bool = True):
+        """启动预热：按语言对试翻译一次（同时加载本地模型），并预先建立到各服务的连接"""
+        local_model_type = os.getenv("LOCAL_MODEL_TYPE", "transformers")
+        model_name = os.getenv("LOCAL_MODEL_NAME", "helsinki-nlp/opus-mt-en-zh")
+        use_server = bool(os.getenv("LOCAL_MODEL_SERVER_URL"))
+        
+        for source_lang, target_lang in model_pairs:
+            started = time.monotonic()
+            sample = WARMUP_SAMPLES.get(source_lang, WARMUP_SAMPLES["en"])
+            try:
+                if local_model_type in ("transformers", "onnx") and not use_server:
+                    # 直接调用推理，避免库缺失时降级到付费的云端服务
+                    _, pair_model = self._marian_model_name(sample, target_lang, source_lang, model_name)
+                    await self._run_local_inference(local_model_type, pair_model, sample)
+                else:
+                    await self._translate_with_local_model(sample, target_lang, source_lang)
+                readiness.record(f"model:{source_lang}-{target_lang}", True, started)
+            except Exception as e:
+                logger.warning(f"Warm-up translation {source_lang}-{target_lang} failed: {str(e)}")
+                readiness.record(f"model:{source_lang}-{target_lang}", False, started, str(e))
+        
+        if prime_connections:
+            started = time.monotonic()
+            urls = [PROVIDER_BASE_URLS[service] for service in self._configured_services() if service in PROVIDER_BASE_URLS]
+            for url in (os.getenv("LOCAL_MODEL_SERVER_URL"), os.getenv("OLLAMA_SERVER_URL") if local_model_type == "ollama" else None):
+                if url:
+                    urls.append(url)
+            results = await prime(urls)
+            failed = [url for url, ok in results.items() if not ok]
+            readiness.record("connections", not failed, started, f"unreachable: {', '.join(failed)}" if failed else None)
+    
+    def _check_service(self, preferred_service: str):
+        if preferred_service != "auto" and preferred_service not in self.services:
+            raise HTTPException(status_code=400, detail=f"Unsupported translation service: {preferred_service}")
+    
+    def _configured_services(self) -> List[str]:
+        """已配置的翻译服务（auto 模式的候选）"""
+        required_keys = {
+            "openai": "OPENAI_API_KEY",
+            "azure": "AZURE_TRANSLATE_KEY",
+            "google": "GOOGLE_TRANSLATE_KEY",
+            "deepl": "DEEPL_API_KEY"
+        }
+        return [
+            service for service in self.services
+            if service not in required_keys or os.getenv(required_keys[service])
+        ]
+    
+    def _detect_source_lang(self, text: str, source_lang: str) -> str:
+        """source_lang为auto时本地识别语言，置信度不足时保持auto
+        
+        识别结果只用于判断原文是否已是目标语言，不作为源语言传给翻译服务（由服务自行识别）。
+        """
+        if source_lang == "auto":
+            detected, confidence = detect_language(text)
+            if detected and confidence >= MIN_CONFIDENCE:
+                return detected
+        return source_lang
+    
     async def translate(self, text: str, target_lang: str, source_lang: str = "auto", preferred_service: str = "openai") -> Dict[str, Any]:
         """执行翻译，支持服务降级"""
-        service_func = self.services.get(preferred_service)
-        if not service_func:
-            raise HTTPException(status_code=400, detail=f"Unsupported translation service: {preferred_service}")
+        self._check_service(preferred_service)
+        
+        detected_lang = self._detect_source_lang(text, source_lang)
+        
+        # 原文已是目标语言，无需调用翻译服务
+        if detected_lang == target_lang:
+            return {
+                "translated_text": text,
+                "service": "none",
+                "detected_language": detected_lang
+            }
+        
+        if self.memory.enabled:
+            result = await self._translate_with_memory(text, target_lang, source_lang, preferred_service)
+        else:
+            result = await self._translate_chunked(text, target_lang, source_lang, preferred_service)
+        if result.get("detected_language") in (None, "auto", "unknown") and detected_lang != "auto":
+            result = {**result, "detected_language": detected_lang}
+        self._notify(text, result, target_lang)
+        return result
+    
+    async def _translate_with_memory(self, text: str, target_lang: str, source_lang: str, preferred_service: str) -> Dict[str, Any]:
+        """按句子分段查询翻译记忆，只把未命中的连续片段发给翻译服务，再按原顺序拼接"""
+        segments = segment_text(text)
+        translations = [self.memory.get(core, source_lang, target_lang) if core else "" for core, _ in segments]
+        
+        # 相邻的未命中片段合并为一次请求，避免逐句调用
+        runs = []
+        for index, translation in enumerate(translations):
+            if translation is None:
+                if runs and runs[-1][-1] == index - 1:
+                    runs[-1].append(index)
+                else:
+                    runs.append([index])
+        
+        service = "memory"
+        if runs:
+            results = await asyncio.gather(*(
+                self._translate_run([segments[i] for i in run], target_lang, source_lang, preferred_service)
+                for run in runs
+            ))
+            for run, (run_translations, run_service) in zip(runs, results):
+                for index, translation in zip(run, run_translations):
+                    translations[index] = translation
+                service = run_service
         
+        pieces = []  # [译文, 分隔符]
+        for (core, separator), translation in zip(segments, translations):
+            if not core:
+                pieces.append(["", separator])
+            elif translation:
+                pieces.append([translation, adapt_separator(separator, target_lang)])
+            elif pieces:
+                # 无法逐句对齐的片段已合并到前一个片段的译文中，沿用其分隔符以保留换行和段落
+                pieces[-1][1] = adapt_separator(separator, target_lang)
+        
+        return {
+            "translated_text": "".join(translation + separator for translation, separator in pieces).rstrip() + segments[-1][1] if segments else text,
+            "service": service,
+            "detected_language": source_lang
+        }
+    
+    async def _translate_run(self, run_segments, target_lang: str, source_lang: str, preferred_service: str):
+        """翻译一段连续的未命中片段，返回 (逐片段译文列表, 服务名)
+        
+        译文句子数与原文一致时逐句写入翻译记忆；无法对齐时整段译文放在第一个片段上，只有单句才写入记忆。
+        """
+        run_text = "".join(core + separator for core, separator in run_segments).rstrip()
+        result = await self._translate_chunked(run_text, target_lang, source_lang, preferred_service)
+        # 降级服务返回的是原文，不能写入翻译记忆
+        cacheable = not result["service"].endswith("_fallback")
+        return self._remember(run_segments, result["translated_text"], target_lang, source_lang, cacheable), result["service"]
+    
+    def _remember(self, run_segments, translated_text: str, target_lang: str, source_lang: str, cacheable: bool = True):
+        """把译文与原文片段对齐并写入翻译记忆，返回逐片段译文列表"""
+        translated_text = translated_text.strip()
+        translated_segments = [core for core, _ in segment_text(translated_text) if core]
+        if len(translated_segments) == len(run_segments):
+            if cacheable:
+                for (core, _), translation in zip(run_segments, translated_segments):
+                    self.memory.put(core, source_lang, target_lang, translation)
+            return translated_segments
+        
+        if cacheable and len(run_segments) == 1:
+            self.memory.put(run_segments[0][0], source_lang, target_lang, translated_text)
+        return [translated_text] + [""] * (len(run_segments) - 1)
+    
+    async def _translate_chunked(self, text: str, target_lang: str, source_lang: str, preferred_service: str) -> Dict[str, Any]:
+        """超过服务输入上限的文本按句子边界分块，并发翻译后按顺序拼接"""
+        max_tokens = CHUNK_TOKEN_LIMITS.get(preferred_service, 800)
+        if estimate_tokens(text) <= max_tokens:
+            return await self._translate_with_fallback(text, target_lang, source_lang, preferred_service)
+        
+        chunks = chunk_text(text, max_tokens)
+        semaphore = asyncio.Semaphore(self.chunk_concurrency)
+        
+        async def translate_chunk(chunk: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._translate_with_fallback(chunk, target_lang, source_lang, preferred_service)
+        
+        results = await asyncio.gather(*(translate_chunk(chunk) for chunk, _ in chunks))
+        translated_text = "".join(
+            result["translated_text"].strip() + adapt_separator(separator, target_lang)
+            for result, (_, separator) in zip(results, chunks)
+        ).rstrip()
+        services = {result["service"] for result in results}
+        # 任一块降级为原文时，整体标记为降级结果，避免写入翻译记忆
+        fallback_services = [service for service in services if service.endswith("_fallback")]
+        return {
+            "translated_text": translated_text,
+            "service": fallback_services[0] if fallback_services else results[0]["service"],
+            "detected_language": results[0].get("detected_language", source_lang)
+        }
+    
+    async def _call_service(self, service: str, text: str, target_lang: str, source_lang: str) -> Dict[str, Any]:
+        """经过调度器准入后调用翻译服务"""
+        try:
+            async with self.scheduler.gate(service).admit(len(text)):
+                started = time.monotonic()
+                try:
+                    result = await self.services[service](text, target_lang, source_lang)
+                except Exception:
+                    self.router.record(service, source_lang, target_lang, len(text), time.monotonic() - started, ok=False)
+                    raise
+                # 返回原文的降级结果不算成功
+                ok = not result["service"].endswith("_fallback")
+                self.router.record(service, source_lang, target_lang, len(text), time.monotonic() - started, ok=ok)
+                return result
+        except LocalModelUnavailable:
+            # 此时已退出本地服务的准入，云端服务的延迟不会计入本地服务
+            return await self._substitute_local_model(text, target_lang, source_lang)
+    
+    async def _substitute_local_model(self, text: str, target_lang: str, source_lang: str) -> Dict[str, Any]:
+        """本地推理依赖未安装时（如云端部署），依次尝试云端翻译服务，全部失败时返回原文"""
+        for service in ["openai", "azure", "google", "deepl"]:
+            try:
+                logger.info(f"尝试使用{service}翻译服务作为本地模型的替代")
+                return await self._call_service(service, text, target_lang, source_lang)
+            except Exception as e:
+                logger.warning(f"{service}服务也不可用: {str(e)}")
+        
+        return {
+            "translated_text": text,
+            "service": "local_fallback",
+            "detected_language": source_lang
+        }
+    
+    async def _translate_with_routing(self, text: str, target_lang: str, source_lang: str) -> Dict[str, Any]:
+        """auto 模式：按路由器给出的顺序依次尝试已配置的服务"""
+        degraded = None
+        for service in self.router.rank(self._configured_services(), source_lang, target_lang, len(text)):
+            try:
+                result = await self._call_service(service, text, target_lang, source_lang)
+            except Exception as e:
+                logger.error(f"Routed service {service} failed: {str(e)}")
+                continue
+            if not result["service"].endswith("_fallback"):
+                return result
+            # 只返回了原文，继续尝试其他服务，全部失败时再使用
+            degraded = degraded or result
+        
+        if degraded:
+            return degraded
+        raise HTTPException(status_code=500, detail="All translation services failed")
+    
+    async def _translate_with_fallback(self, text: str, target_lang: str, source_lang: str, preferred_service: str) -> Dict[str, Any]:
+        """调用首选翻译服务，失败时依次尝试其他服务"""
+        if preferred_service == "auto":
+            return await self._translate_with_routing(text, target_lang, source_lang)
         try:
-            return await service_func(text, target_lang, source_lang)
+            return await self._call_service(preferred_service, text, target_lang, source_lang)
         except Exception as e:
             logger.error(f"Primary service {preferred_service} failed: {str(e)}")
             
@@ -210,12 +536,249 @@ class TranslationService:
             for fallback_service in fallback_services:
                 try:
                     logger.info(f"Trying fallback service: {fallback_service}")
-                    return await self.services[fallback_service](text, target_lang, source_lang)
+                    return await self._call_service(fallback_service, text, target_lang, source_lang)
                 except Exception as fallback_error:
                     logger.error(f"Fallback service {fallback_service} failed: {str(fallback_error)}")
             
             raise HTTPException(status_code=500, detail="All translation services failed")
     
+    def _packing_provider(self, preferred_service: str):
+        """返回支持多文本打包的LLM服务名，不支持时返回None"""
+        if preferred_service == "openai" and os.getenv("OPENAI_API_KEY"):
+            return "openai"
+        if (preferred_service == "local" and os.getenv("LOCAL_MODEL_TYPE", "transformers") == "ollama"
+                and not os.getenv("LOCAL_MODEL_SERVER_URL")):
+            return "local_ollama"
+        return None
+    
+    async def translate_many(self, texts: List[str], target_lang: str, source_lang: str = "auto", preferred_service: str = "openai") -> List[Dict[str, Any]]:
+        """批量翻译多条文本
+        
+        LLM服务会把短文本打包成一次请求，解析失败时退回逐条翻译。
+        """
+        self._check_service(preferred_service)
+        
+        results: List[Any] = [None] * len(texts)
+        pending: List[int] = []  # 需要调用服务的文本下标
+        for index, text in enumerate(texts):
+            detected_lang = self._detect_source_lang(text, source_lang)
+            segments = [segment for segment in segment_text(text) if segment[0]]
+            cached = [self.memory.get(core, source_lang, target_lang) for core, _ in segments] if self.memory.enabled else [None]
+            if detected_lang == target_lang or not segments:
+                results[index] = {"translated_text": text, "service": "none", "detected_language": detected_lang}
+            elif all(translation is not None for translation in cached):
+                translated = "".join(
+                    translation + adapt_separator(separator, target_lang)
+                    for (_, separator), translation in zip(segments, cached)
+                ).rstrip()
+                results[index] = {"translated_text": translated, "service": "memory", "detected_language": detected_lang}
+                self._notify(text, results[index], target_lang)
+            else:
+                pending.append(index)
+        
+        packing_service = self._packing_provider(preferred_service)
+        tasks = []
+        if packing_service:
+            for group in pack_texts([texts[i] for i in pending]):
+                tasks.append(self._translate_pack([pending[i] for i in group], texts, target_lang, source_lang, preferred_service, packing_service, results))
+        else:
+            tasks.extend(self._translate_into(results, i, texts[i], target_lang, source_lang, preferred_service) for i in pending)
+        # 逐条翻译的结果已在 translate() 中通知，这里不再重复通知
+        await asyncio.gather(*tasks)
+        return results
+    
+    async def _translate_into(self, results: List[Any], index: int, text: str, target_lang: str, source_lang: str, preferred_service: str):
+        results[index] = await self.translate(text, target_lang, source_lang, preferred_service)
+    
+    async def _translate_pack(self, indexes: List[int], texts: List[str], target_lang: str, source_lang: str,
+                              preferred_service: str, packing_service: str, results: List[Any]):
+        """用一次LLM请求翻译一组文本，结果条数或格式不符时逐条翻译"""
+        group_texts = [texts[i] for i in indexes]
+        translations = None
+        if len(group_texts) > 1:
+            try:
+                system, user = build_packed_messages(group_texts, target_lang, source_lang)
+                async with self.scheduler.gate(preferred_service).admit(sum(len(t) for t in group_texts)):
+                    output = await self._complete_packed(packing_service, system, user, sum(estimate_tokens(t) for t in group_texts))
+                translations = parse_packed_output(output, len(group_texts))
+                if translations is None:
+                    logger.warning(f"Packed translation output could not be parsed, translating {len(group_texts)} texts individually")
+            except Exception as e:
+                logger.error(f"Packed translation with {packing_service} failed: {str(e)}")
+        
+        if translations is None:
+            await asyncio.gather(*(
+                self._translate_into(results, index, texts[index], target_lang, source_lang, preferred_service)
+                for index in indexes
+            ))
+            return
+        
+        for index, translation in zip(indexes, translations):
+            segments = [segment for segment in segment_text(texts[index]) if segment[0]]
+            if self.memory.enabled:
+                self._remember(segments, translation, target_lang, source_lang)
+            results[index] = {"translated_text": translation, "service": packing_service, "detected_language": source_lang}
+            self._notify(texts[index], results[index], target_lang)
+    
+    async def _complete_packed(self, packing_service: str, system: str, user: str, input_tokens: int) -> str:
+        """发送打包翻译请求，返回模型的原始输出"""
+        if packing_service == "openai":
+            async with pooled_client(timeout=60.0) as client:
+                response = await client.post(
+                    "https://api.openai.com/v1/chat/completions",
+                    headers={
+                        "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}",
+                        "Content-Type": "application/json"
+                    },
+                    json={
+                        "model": "gpt-3.5-turbo",
+                        "messages": [
+                            {"role": "system", "content": system},
+                            {"role": "user", "content": user}
+                        ],
+                        "response_format": {"type": "json_object"},
+                        "max_tokens": min(4096, input_tokens * 2 + 256),
+                        "temperature": 0.3
+                    }
+                )
+                if response.status_code == 429:
+                    raise ProviderRateLimited("openai", parse_retry_after(response.headers.get("Retry-After")))
+                if response.status_code != 200:
+                    raise Exception(f"OpenAI API error: {response.status_code}")
+                return response.json()["choices"][0]["message"]["content"]
+        
+        ollama_url = os.getenv("OLLAMA_SERVER_URL", "http://localhost:11434")
+        async with pooled_client(timeout=120.0) as client:
+            response = await client.post(
+                f"{ollama_url}/api/generate",
+                json={
+                    "model": os.getenv("LOCAL_MODEL_NAME", "helsinki-nlp/opus-mt-en-zh"),
+                    "system": system,
+                    "prompt": user,
+                    "format": "json",
+                    "stream": False,
+                    "options": {
+                        "temperature": 0.3,
+                        "top_p": 0.9
+                    }
+                }
+            )
+            if response.status_code != 200:
+                raise Exception(f"Ollama server error: {response.status_code}")
+            return response.json().get("response", "")
+    
+    def _streaming_provider(self, preferred_service: str):
+        """返回支持逐token输出的服务 (流式函数, 服务名)，不支持时返回None"""
+        service_name = self._packing_provider(preferred_service)
+        if service_name == "openai":
+            return self._stream_openai, service_name
+        if service_name == "local_ollama":
+            return self._stream_ollama, service_name
+        return None
+    
+    async def translate_stream(self, text: str, target_lang: str, source_lang: str = "auto", preferred_service: str = "openai") -> AsyncIterator[Dict[str, Any]]:
+        """流式翻译，依次产出 delta 事件和最终的 done 事件
+        
+        不支持流式的服务、翻译记忆全部命中或无需翻译时，只产出一个 delta 事件。
+        """
+        self._check_service(preferred_service)
+        
+        detected_lang = self._detect_source_lang(text, source_lang)
+        segments = [segment for segment in segment_text(text) if segment[0]]
+        streaming = self._streaming_provider(preferred_service)
+        fully_cached = all(self.memory.get(core, source_lang, target_lang) is not None for core, _ in segments)
+        
+        if streaming is None or detected_lang == target_lang or fully_cached:
+            result = await self.translate(text, target_lang, source_lang, preferred_service)
+            yield {"event": "delta", "text": result["translated_text"]}
+            yield {"event": "done", **result}
+            return
+        
+        stream_func, service_name = streaming
+        pieces = []
+        try:
+            chunks = chunk_text(text, CHUNK_TOKEN_LIMITS.get(preferred_service, 800))
+            for index, (chunk, separator) in enumerate(chunks):
+                async with self.scheduler.gate(preferred_service).admit(len(chunk)):
+                    async for delta in stream_func(chunk, target_lang, source_lang):
+                        pieces.append(delta)
+                        yield {"event": "delta", "text": delta}
+                if index < len(chunks) - 1:
+                    joiner = adapt_separator(separator, target_lang)
+                    pieces.append(joiner)
+                    yield {"event": "delta", "text": joiner}
+        except Exception as e:
+            logger.error(f"Streaming translation with {service_name} failed: {str(e)}")
+            if pieces:
+                yield {"event": "error", "detail": f"Streaming translation failed: {str(e)}"}
+                return
+            # 尚未输出任何内容时，退回到带服务降级的普通翻译
+            result = await self.translate(text, target_lang, source_lang, preferred_service)
+            yield {"event": "delta", "text": result["translated_text"]}
+            yield {"event": "done", **result}
+            return
+        
+        translated_text = "".join(pieces).strip()
+        if self.memory.enabled and segments:
+            self._remember(segments, translated_text, target_lang, source_lang)
+        result = {
+            "translated_text": translated_text,
+            "service": service_name,
+            "detected_language": source_lang
+        }
+        self._notify(text, result, target_lang)
+        yield {"event": "done", **result}
+    
+    async def _stream_openai(self, text: str, target_lang: str, source_lang: str = "auto") -> AsyncIterator[str]:
+        """使用OpenAI流式接口翻译，逐段产出译文"""
+        api_key = os.getenv("OPENAI_API_KEY")
+        async with pooled_client(timeout=30.0) as client:
+            async with client.stream(
+                "POST",
+                "https://api.openai.com/v1/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json"
+                },
+                json=self._openai_payload(text, target_lang, stream=True)
+            ) as response:
+                if response.status_code == 429:
+                    raise ProviderRateLimited("openai", parse_retry_after(response.headers.get("Retry-After")))
+                if response.status_code != 200:
+                    await response.aread()
+                    raise Exception(f"OpenAI API error: {response.status_code}")
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    data = line[len("data: "):]
+                    if data == "[DONE]":
+                        break
+                    delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+    
+    async def _stream_ollama(self, text: str, target_lang: str, source_lang: str = "auto") -> AsyncIterator[str]:
+        """使用Ollama流式接口翻译，逐段产出译文"""
+        ollama_url = os.getenv("OLLAMA_SERVER_URL", "http://localhost:11434")
+        model_name = os.getenv("LOCAL_MODEL_NAME", "helsinki-nlp/opus-mt-en-zh")
+        async with pooled_client(timeout=120.0) as client:
+            async with client.stream(
+                "POST",
+                f"{ollama_url}/api/generate",
+                json=self._ollama_payload(text, target_lang, source_lang, model_name, stream=True)
+            ) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    raise Exception(f"Ollama server error: {response.status_code}")
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    data = json.loads(line)
+                    if data.get("response"):
+                        yield data["response"]
+                    if data.get("done"):
+                        break
+    
     async def _translate_with_local_model(self, text: str, target_lang: str, source_lang: str = "auto") -> Dict[str, Any]:
         """使用本地部署的翻译模型进行翻译"""
         try:
@@ -231,6 +794,8 @@ class TranslationService:
                 # 使用本地加载的模型
                 return await self._translate_with_local_transformers(text, target_lang, source_lang, local_model_type, model_name)
                 
+        except LocalModelUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Local model translation failed: {str(e)}")
             raise Exception(f"Local model translation failed: {str(e)}")
@@ -238,7 +803,7 @@ class TranslationService:
     async def _translate_with_local_server(self, text: str, target_lang: str, source_lang: str, server_url: str) -> Dict[str, Any]:
         """使用本地模型服务器进行翻译"""
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with pooled_client(timeout=60.0) as client:
                 response = await client.post(
                     f"{server_url}/translate",
                     json={
@@ -270,6 +835,8 @@ class TranslationService:
             
             if model_type == "transformers":
                 return await self._use_huggingface_transformers(text, target_lang, source_lang, model_name)
+            elif model_type == "onnx":
+                return await self._use_onnx_model(text, target_lang, source_lang, model_name)
             elif model_type == "ollama":
                 return await self._use_ollama_model(text, target_lang, source_lang, model_name)
             elif model_type == "custom":
@@ -277,93 +844,83 @@ class TranslationService:
             else:
                 raise Exception(f"Unsupported local model type: {model_type}")
                 
+        except LocalModelUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Local transformers translation failed: {str(e)}")
             raise Exception(f"Local transformers translation failed: {str(e)}")
     
+    def _marian_model_name(self, text: str, target_lang: str, source_lang: str, model_name: str):
+        """确定源语言和MarianMT模型名称，返回 (源语言, 模型名)
+        
+        语言对已知时按语言对构建模型名称（例如 helsinki-nlp/opus-mt-en-zh）；源语言无法识别时，
+        若配置的 LOCAL_MODEL_NAME 正好翻译到目标语言则使用它，否则假设源语言为英文。
+        """
+        if source_lang == "auto":
+            detected, confidence = detect_language(text)
+            if detected and confidence >= MIN_CONFIDENCE:
+                source_lang = detected
+        
+        if source_lang == "auto":
+            prefix = "helsinki-nlp/opus-mt-"
+            configured_source, _, configured_target = model_name[len(prefix):].partition("-")
+            if model_name.startswith(prefix) and configured_target == target_lang:
+                return configured_source, model_name
+            source_lang = "en"
+        return source_lang, f"helsinki-nlp/opus-mt-{source_lang}-{target_lang}"
+    
+    async def _run_local_inference(self, backend: str, model_name: str, text: str) -> str:
+        """执行本地模型推理：推理进程池已启动时交给工作进程，否则在线程池中运行"""
+        if inference_pool.running:
+            return await inference_pool.translate(backend, model_name, text)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, model_registry.translate, backend, model_name, text)
+    
+    async def _use_onnx_model(self, text: str, target_lang: str, source_lang: str, model_name: str) -> Dict[str, Any]:
+        """使用ONNX Runtime运行int8量化的MarianMT模型（CPU推理）"""
+        try:
+            import onnxruntime  # noqa: F401
+            import optimum.onnxruntime  # noqa: F401
+        except ImportError:
+            logger.warning("optimum[onnxruntime]未安装，降级到Transformers后端")
+            return await self._use_huggingface_transformers(text, target_lang, source_lang, model_name)
+        
+        source_lang, model_name = self._marian_model_name(text, target_lang, source_lang, model_name)
+        
+        translated_text = await self._run_local_inference("onnx", model_name, text)
+        
+        return {
+            "translated_text": translated_text,
+            "service": "local_onnx",
+            "detected_language": source_lang
+        }
+    
     async def _use_huggingface_transformers(self, text: str, target_lang: str, source_lang: str, model_name: str) -> Dict[str, Any]:
         """使用Hugging Face Transformers模型"""
+        # 检查是否安装了transformers库
+        try:
+            import torch  # noqa: F401
+            import transformers  # noqa: F401
+        except ImportError:
+            # 在云端部署时，由 _call_service 降级到其他翻译服务
+            logger.warning("Transformers库未安装，降级到云端翻译服务")
+            raise LocalModelUnavailable("transformers is not installed")
+        
         try:
-            # 检查是否安装了transformers库
+            # 构建语言对模型名称
+            source_lang, model_name = self._marian_model_name(text, target_lang, source_lang, model_name)
+            
             try:
-                import torch
-                from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
-                from transformers.pipelines import pipeline
-            except ImportError:
-                logger.warning("Transformers库未安装，降级到云端翻译服务")
-                # 在云端部署时，自动降级到其他翻译服务
-                for service in ["openai", "azure", "google", "deepl"]:
-                    try:
-                        if service in self.services:
-                            logger.info(f"尝试使用{service}翻译服务作为本地模型的替代")
-                            return await self.services[service](text, target_lang, source_lang)
-                    except Exception as e:
-                        logger.warning(f"{service}服务也不可用: {str(e)}")
-                        continue
-                
-                # 如果所有服务都不可用，返回原文
+                translated_text = await self._run_local_inference("transformers", model_name, text)
+            except Exception as e:
+                logger.error(f"Transformers model error: {str(e)}")
+                # 返回原文并标记为降级结果：不计为成功，也不写入翻译记忆和检索索引
                 return {
                     "translated_text": text,
-                    "service": "local_fallback",
+                    "service": "local_transformers_fallback",
                     "detected_language": source_lang
                 }
             
-            # 构建语言对模型名称
-            if source_lang == "auto":
-                # 简化处理，假设为英文
-                source_lang = "en"
-            
-            # 构建模型名称 (例如: helsinki-nlp/opus-mt-en-zh)
-            if model_name.startswith("helsinki-nlp/opus-mt-"):
-                # 使用指定的模型
-                pass
-            else:
-                # 自动构建模型名称
-                model_name = f"helsinki-nlp/opus-mt-{source_lang}-{target_lang}"
-            
-            # 这里实现实际的模型加载和翻译逻辑
-            # 为了避免阻塞，应该在线程池中运行
-            import asyncio
-            import concurrent.futures
-            
-            def translate_sync():
-                try:
-                    # 检查设备
-                    device = "mps" if torch.backends.mps.is_available() else "cpu"
-                    
-                    # 加载模型和分词器 - 修复meta tensor问题
-                    tokenizer = AutoTokenizer.from_pretrained(model_name)
-                    model = AutoModelForSeq2SeqLM.from_pretrained(
-                        model_name,
-                        torch_dtype=torch.float32,  # 指定数据类型
-                        device_map=None  # 不使用自动设备映射
-                    )
-                    
-                    # 手动将模型移动到设备
-                    model = model.to(device)
-                    
-                    # 创建翻译管道
-                    translator = pipeline(
-                        "translation", 
-                        model=model, 
-                        tokenizer=tokenizer,
-                        device=0 if device == "mps" else -1
-                    )
-                    
-                    # 执行翻译
-                    result = translator(text, max_length=512)
-                    translated_text = result[0]['translation_text'] if result else text
-                    
-                    return translated_text
-                except Exception as e:
-                    logger.error(f"Transformers model error: {str(e)}")
-                    return text  # 翻译失败时返回原文
-            
-            # 在线程池中运行同步代码
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                translated_text = await loop.run_in_executor(executor, translate_sync)
-            
             return {
                 "translated_text": translated_text,
                 "service": "local_transformers",
@@ -379,25 +936,31 @@ class TranslationService:
                 "detected_language": source_lang
             }
     
+    def _ollama_payload(self, text: str, target_lang: str, source_lang: str, model_name: str, stream: bool = False) -> Dict[str, Any]:
+        """构造Ollama翻译请求体"""
+        if source_lang == "auto":
+            prompt = f"Translate the following text to {target_lang}. Only return the translation, no explanations:\n\n{text}"
+        else:
+            prompt = f"Translate the following text from {source_lang} to {target_lang}. Only return the translation, no explanations:\n\n{text}"
+        return {
+            "model": model_name,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {
+                "temperature": 0.3,
+                "top_p": 0.9
+            }
+        }
+    
     async def _use_ollama_model(self, text: str, target_lang: str, source_lang: str, model_name: str) -> Dict[str, Any]:
         """使用Ollama本地大语言模型进行翻译"""
         try:
             ollama_url = os.getenv("OLLAMA_SERVER_URL", "http://localhost:11434")
             
-            prompt = f"Translate the following text from {source_lang} to {target_lang}. Only return the translation, no explanations:\n\n{text}"
-            
-            async with httpx.AsyncClient(timeout=120.0) as client:
+            async with pooled_client(timeout=120.0) as client:
                 response = await client.post(
                     f"{ollama_url}/api/generate",
-                    json={
-                        "model": model_name,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.3,
-                            "top_p": 0.9
-                        }
-                    }
+                    json=self._ollama_payload(text, target_lang, source_lang, model_name)
                 )
                 
                 if response.status_code == 200:
@@ -468,9 +1031,85 @@ async def translate_text(request: TranslationRequest):
         logger.error(f"Translation error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Translation failed: {str(e)}")
 
+@router.post("/batch", response_model=BatchTranslationResponse)
+async def translate_batch(request: BatchTranslationRequest):
+    """批量翻译多条文本（例如一页回复），LLM服务会合并为少量请求"""
+    if not request.texts:
+        raise HTTPException(status_code=400, detail="Missing required parameter: texts")
+    
+    if len(request.texts) > 50:
+        raise HTTPException(status_code=400, detail="Too many texts. Maximum 50 texts per request.")
+    
+    if any(len(text) > 5000 for text in request.texts):
+        raise HTTPException(status_code=400, detail="Text too long. Maximum 5000 characters allowed.")
+    
+    try:
+        source_lang = request.source_lang.value if request.source_lang else "auto"
+        results = await translation_service.translate_many(
+            texts=request.texts,
+            target_lang=request.target_lang.value,
+            source_lang=source_lang,
+            preferred_service=request.service.value
+        )
+        
+        return BatchTranslationResponse(translations=[TranslationResponse(**result) for result in results])
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch translation error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Translation failed: {str(e)}")
+
+@router.post("/stream")
+async def translate_text_stream(request: TranslationRequest):
+    """流式翻译（Server-Sent Events），逐步返回译文"""
+    if not request.text or not request.target_lang:
+        raise HTTPException(status_code=400, detail="Missing required parameters: text and target_lang")
+    
+    if len(request.text) > 5000:
+        raise HTTPException(status_code=400, detail="Text too long. Maximum 5000 characters allowed.")
+    
+    source_lang = request.source_lang.value if request.source_lang else "auto"
+    
+    async def event_stream():
+        try:
+            async for event in translation_service.translate_stream(
+                text=request.text,
+                target_lang=request.target_lang.value,
+                source_lang=source_lang,
+                preferred_service=request.service.value
+            ):
+                name = event.pop("event")
+                yield f"event: {name}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        except HTTPException as e:
+            yield f"event: error\ndata: {json.dumps({'detail': e.detail}, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            logger.error(f"Streaming translation error: {str(e)}")
+            yield f"event: error\ndata: {json.dumps({'detail': f'Translation failed: {str(e)}'}, ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/providers")
+async def get_provider_status():
+    """获取各翻译服务的调度状态（并发数、字符配额、限流冷却时间）、路由统计和本地推理进程状态"""
+    return {
+        "scheduler": translation_service.scheduler.stats(),
+        "routing": translation_service.router.stats(),
+        "local_inference": inference_pool.stats()
+    }
+
 @router.get("/languages")
-async def get_supported_languages():
+async def get_supported_languages(request: Request, response: Response):
     """获取支持的语言列表"""
+    etag = make_etag("languages", LANGUAGES_VERSION, epoch=False)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "public, max-age=3600"
     return {
         "zh": "Chinese (Simplified)",
         "zh-TW": "Chinese (Traditional)",
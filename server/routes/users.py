@@ -1,44 +1,32 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from models import UserResponse
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from models import UserResponse, UsersResponse
+from services.user_repository import user_repository
 
 router = APIRouter()
 
-# 简单的内存存储（演示用）
-users_db = [
-    {
-        "id": "1",
-        "username": "admin",
-        "email": "admin@example.com",
-        "preferred_language": "en",
-        "join_date": "2024-01-01"
-    },
-    {
-        "id": "2",
-        "username": "pierre",
-        "email": "pierre@example.com",
-        "preferred_language": "fr",
-        "join_date": "2024-01-02"
-    },
-    {
-        "id": "3",
-        "username": "maria",
-        "email": "maria@example.com",
-        "preferred_language": "es",
-        "join_date": "2024-01-02"
-    }
-]
-
-@router.get("/", response_model=List[UserResponse])
-async def get_users():
-    """获取用户列表（演示用）"""
-    return [UserResponse(**user) for user in users_db]
+@router.get("/", response_model=UsersResponse)
+async def get_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100)
+):
+    """按用户ID分页获取用户列表，cursor 为上一页返回的 next_cursor"""
+    try:
+        users, next_cursor = user_repository.page(cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    return UsersResponse(
+        users=[UserResponse(**user) for user in users],
+        next_cursor=next_cursor,
+        total=len(user_repository)
+    )
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(user_id: str):
     """获取特定用户信息"""
-    user = next((u for u in users_db if u["id"] == user_id), None)
+    user = user_repository.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return UserResponse(**user) 
\ No newline at end of file
+    return UserResponse(**user)
@@ -0,0 +1,84 @@
+"""
+帖子变更日志：按版本号记录创建、回复、点赞和删除，供客户端增量同步
+
+版本号只在进程内有效，每次启动生成新的 epoch，客户端同步时需同时提交 epoch。
+只保留最近的若干条记录；客户端的版本号早于保留窗口或 epoch 不一致（来自重启前的进程）时，
+返回 resync 标记，客户端应重新拉取完整数据。
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+import uuid
+
+
+class ChangeLog:
+    """有界的变更日志，版本号单调递增"""
+
+    def __init__(self, max_entries: int = 1000, version: int = 1, epoch: Optional[str] = None):
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=max_entries)
+        self.version = version
+        self.epoch = epoch or uuid.uuid4().hex[:8]
+
+    def record(self, change_type: str, post_id: str, data: Optional[Dict[str, Any]] = None) -> int:
+        """记录一次变更，返回新的版本号"""
+        self.version += 1
+        self._entries.append({
+            "version": self.version,
+            "type": change_type,
+            "post_id": post_id,
+            "data": data or {}
+        })
+        return self.version
+
+    @property
+    def oldest_version(self) -> int:
+        """保留窗口内最早的版本号；日志为空时为当前版本"""
+        return self._entries[0]["version"] if self._entries else self.version
+
+    def since(self, version: int, epoch: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """返回 version 之后的变更；epoch 不一致或无法增量同步时返回None"""
+        if epoch != self.epoch or version > self.version:
+            return None
+        if self._entries and version < self._entries[0]["version"] - 1:
+            return None
+        if not self._entries and version != self.version:
+            return None
+        # 版本号连续，可直接按偏移定位
+        start = len(self._entries) - (self.version - version)
+        return [self._entries[i] for i in range(start, len(self._entries))]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "epoch": self.epoch,
+            "version": self.version,
+            "oldest_version": self.oldest_version,
+            "entries": len(self._entries),
+            "max_entries": self._entries.maxlen
+        }
+
+
+def compact_changes(changes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """合并同一帖子的冗余变更：点赞只保留最后一次；帖子被删除时丢弃之前的变更，
+    在窗口内创建又删除的帖子整体丢弃"""
+    created = set()
+    deleted = set()
+    last_like: Dict[str, int] = {}
+    for index, change in enumerate(changes):
+        if change["type"] == "post_created":
+            created.add(change["post_id"])
+        elif change["type"] == "post_deleted":
+            deleted.add(change["post_id"])
+        elif change["type"] == "post_liked":
+            last_like[change["post_id"]] = index
+
+    compacted = []
+    for index, change in enumerate(changes):
+        post_id = change["post_id"]
+        if post_id in deleted:
+            if change["type"] == "post_deleted" and post_id not in created:
+                compacted.append(change)
+            continue
+        if change["type"] == "post_liked" and last_like[post_id] != index:
+            continue
+        compacted.append(change)
+    return compacted
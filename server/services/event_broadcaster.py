@@ -0,0 +1,121 @@
+"""
+进程内事件广播：帖子创建、回复、点赞和删除时推送给订阅者
+
+每个订阅者有一个有界队列，发布时非阻塞写入；队列写满说明客户端消费过慢，
+直接断开该订阅者（客户端重连后重新拉取一次数据），不会拖慢发布方或其他订阅者。
+事件只序列化一次，所有订阅者共享同一份JSON文本。
+"""
+
+from typing import Any, Dict, Iterable, Optional, Set
+import asyncio
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Event:
+    """已序列化的事件"""
+
+    __slots__ = ("id", "type", "language", "json", "sse")
+
+    def __init__(self, event_id: int, event_type: str, language: Optional[str], data: Dict[str, Any]):
+        self.id = event_id
+        self.type = event_type
+        self.language = language
+        self.json = json.dumps(
+            {"id": event_id, "type": event_type, "language": language, "data": data},
+            ensure_ascii=False
+        )
+        self.sse = f"id: {event_id}\nevent: {event_type}\ndata: {self.json}\n\n"
+
+
+class Subscription:
+    """单个订阅者：有界队列 + 可选的语言过滤"""
+
+    def __init__(self, max_queue: int, languages: Optional[Set[str]] = None):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.languages = languages
+        self.dropped = False
+        self.created_at = time.time()
+
+    def wants(self, event: Event) -> bool:
+        return not self.languages or event.language is None or event.language in self.languages
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """等待下一个事件；超时返回None，被断开时抛出 ConnectionResetError"""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is None:
+            raise ConnectionResetError("subscriber dropped: event queue overflowed")
+        return event
+
+
+class EventBroadcaster:
+    """进程内发布/订阅"""
+
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self._subscribers: Set[Subscription] = set()
+        self._next_id = 1
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, languages: Optional[Iterable[str]] = None) -> Subscription:
+        subscription = Subscription(self.max_queue, set(languages) if languages else None)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self, event_type: str, data: Dict[str, Any], language: Optional[str] = None,
+                event_id: Optional[int] = None) -> Event:
+        """发布事件（非阻塞，只能在事件循环线程中调用）；event_id 默认自动递增"""
+        if event_id is None:
+            event_id = self._next_id
+        event = Event(event_id, event_type, language, data)
+        self._next_id = event_id + 1
+        self.published += 1
+        for subscription in list(self._subscribers):
+            if not subscription.wants(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscription)
+        return event
+
+    def _drop(self, subscription: Subscription):
+        """断开消费过慢的订阅者：清空队列并放入结束标记"""
+        self._subscribers.discard(subscription)
+        subscription.dropped = True
+        self.dropped += 1
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+        logger.info("Dropped slow event subscriber")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+            "last_event_id": self._next_id - 1
+        }
+
+
+def parse_languages(value: Optional[str]) -> Optional[Set[str]]:
+    """解析逗号分隔的语言过滤参数"""
+    if not value:
+        return None
+    languages = {language.strip() for language in value.split(",") if language.strip()}
+    return languages or None
+
+
+# 全局事件广播器
+broadcaster = EventBroadcaster(int(os.getenv("EVENT_QUEUE_SIZE", "100")))
@@ -0,0 +1,85 @@
+"""
+帖子摘要：在写入时按字素簇（用户感知的字符）截断正文
+
+截断不会拆开组合字符、emoji 修饰符/ZWJ 序列、国旗（区域指示符对）或韩文字母组合。
+安装了 regex 库时使用其 \\X 规则，否则使用下面的简化规则。
+"""
+
+from typing import Iterator, List
+import os
+import unicodedata
+
+try:
+    import regex
+    _GRAPHEME_RE = regex.compile(r"\X")
+except ImportError:
+    regex = None
+    _GRAPHEME_RE = None
+
+# 摘要长度（字素簇数）
+EXCERPT_LENGTH = int(os.getenv("POST_EXCERPT_LENGTH", "200"))
+
+_ZWJ = "\u200d"
+_ELLIPSIS = "…"
+
+
+def _is_extend(ch: str) -> bool:
+    """附着在前一个字符上、不能单独成簇的字符"""
+    code = ord(ch)
+    return (
+        unicodedata.category(ch) in ("Mn", "Me", "Mc")
+        or ch == _ZWJ
+        or 0xFE00 <= code <= 0xFE0F          # 变体选择符
+        or 0x1F3FB <= code <= 0x1F3FF        # emoji 肤色修饰符
+        or 0xE0020 <= code <= 0xE007F        # 标签字符（地区旗帜）
+        or 0xE0100 <= code <= 0xE01EF
+        or 0x1160 <= code <= 0x11FF          # 韩文中声/终声字母
+        or 0xD7B0 <= code <= 0xD7FB
+    )
+
+
+def _is_regional_indicator(ch: str) -> bool:
+    return 0x1F1E6 <= ord(ch) <= 0x1F1FF
+
+
+def _simple_graphemes(text: str) -> Iterator[str]:
+    cluster = ""
+    for ch in text:
+        if cluster and (
+            _is_extend(ch)
+            or cluster[-1] == _ZWJ
+            or (cluster[-1] == "\r" and ch == "\n")
+            or (_is_regional_indicator(ch) and len(cluster) == 1 and _is_regional_indicator(cluster))
+        ):
+            cluster += ch
+            continue
+        if cluster:
+            yield cluster
+        cluster = ch
+    if cluster:
+        yield cluster
+
+
+def graphemes(text: str) -> List[str]:
+    """把文本切分为字素簇"""
+    if _GRAPHEME_RE is not None:
+        return _GRAPHEME_RE.findall(text)
+    return list(_simple_graphemes(text))
+
+
+def make_excerpt(text: str, max_length: int = EXCERPT_LENGTH) -> str:
+    """截取前 max_length 个字素簇，被截断时尽量在空白处断开并追加省略号"""
+    text = " ".join(text.split())
+    if len(text) <= max_length:
+        # 字素簇数不会超过码点数
+        return text
+    clusters = graphemes(text)
+    if len(clusters) <= max_length:
+        return text
+    kept = clusters[:max_length]
+    # 以空格分词的语言避免截断在单词中间；中日韩文本通常没有空格，直接按字素截断
+    for index in range(len(kept) - 1, max_length // 2, -1):
+        if kept[index] == " ":
+            kept = kept[:index]
+            break
+    return "".join(kept).rstrip() + _ELLIPSIS
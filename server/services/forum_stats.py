@@ -0,0 +1,102 @@
+"""
+论坛统计：帖子数、回复数、点赞数和语言分布
+
+写操作时增量更新，统计接口读取为O(1)。增量计数可能因遗漏的代码路径而漂移，
+check() 与全量重新计算的结果对比（回复数按回复存储实际计数），repair() 据此修复。
+"""
+
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List
+
+from services.records import PostRecord
+
+
+class ForumStatsTracker:
+    """增量维护的论坛统计：写操作时更新计数，读取为O(1)"""
+
+    def __init__(self):
+        self.total_posts = 0
+        self.total_replies = 0
+        self.total_likes = 0
+        self.language_refs: Counter = Counter()  # 帖子语言 -> 引用计数
+        # repair() 修正数据后递增，供ETag区分修复前后的响应
+        self.generation = 0
+
+    def rebuild(self, posts: Iterable[PostRecord]):
+        """从帖子列表全量重建（启动或修复时使用）"""
+        self.total_posts = 0
+        self.total_replies = 0
+        self.total_likes = 0
+        self.language_refs = Counter()
+        for post in posts:
+            self.post_created(post)
+
+    def post_created(self, post: PostRecord):
+        self.total_posts += 1
+        self.total_replies += post.reply_count
+        self.total_likes += post.likes
+        self.language_refs[post.language] += 1
+
+    def post_deleted(self, post: PostRecord):
+        self.total_posts -= 1
+        self.total_replies -= post.reply_count
+        self.total_likes -= post.likes
+        self.language_refs[post.language] -= 1
+        if self.language_refs[post.language] <= 0:
+            del self.language_refs[post.language]
+
+    def reply_added(self):
+        self.total_replies += 1
+
+    def likes_changed(self, delta: int):
+        self.total_likes += delta
+
+    @property
+    def languages_used(self) -> int:
+        return len(self.language_refs)
+
+    def top_languages(self, limit: int):
+        """按帖子数降序返回最常用的语言"""
+        return [language for language, _ in self.language_refs.most_common(limit)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "total_posts": self.total_posts,
+            "total_replies": self.total_replies,
+            "total_likes": self.total_likes,
+            "languages_used": self.languages_used,
+            "languages": dict(self.language_refs)
+        }
+
+    def check(self, posts: List[PostRecord], reply_count: Callable[[int], int]) -> Dict[str, Any]:
+        """与全量重新计算的结果对比，返回不一致的字段
+
+        帖子上的 reply_count 同样是增量维护的，不能作为基准；回复数由 reply_count(帖子ID)
+        从回复存储重新统计，计数不符的帖子列在 post_reply_counts 中。
+        """
+        expected = ForumStatsTracker()
+        expected.rebuild(posts)
+        stale_posts = {}
+        expected.total_replies = 0
+        for post in posts:
+            count = reply_count(post.id)
+            expected.total_replies += count
+            if post.reply_count != count:
+                stale_posts[str(post.id)] = {"tracked": post.reply_count, "expected": count}
+
+        actual = self.snapshot()
+        differences = {
+            key: {"tracked": actual[key], "expected": value}
+            for key, value in expected.snapshot().items()
+            if actual[key] != value
+        }
+        if stale_posts:
+            differences["post_reply_counts"] = stale_posts
+        return differences
+
+    def repair(self, posts: List[PostRecord], reply_count: Callable[[int], int]):
+        """按回复存储修正各帖子的 reply_count，再全量重建统计"""
+        for post in posts:
+            post.reply_count = reply_count(post.id)
+        self.rebuild(posts)
+        self.generation += 1
@@ -0,0 +1,81 @@
+"""
+翻译服务共享的HTTP连接池
+
+各翻译服务原先每次请求都新建 httpx.AsyncClient，TCP/TLS 连接无法复用。
+这里维护一个进程级的 AsyncClient，调用方仍按调用点指定超时。
+"""
+
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+import asyncio
+import logging
+import os
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """返回共享的 AsyncClient，首次调用时创建"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100")),
+                max_keepalive_connections=int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20")),
+                keepalive_expiry=float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "60"))
+            )
+        )
+    return _client
+
+
+class _TimeoutClient:
+    """为共享连接池上的请求附加默认超时"""
+
+    def __init__(self, client: httpx.AsyncClient, timeout: float):
+        self._client = client
+        self._timeout = timeout
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self._timeout)
+        return self._client.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        kwargs.setdefault("timeout", self._timeout)
+        return self._client.post(url, **kwargs)
+
+    def stream(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self._timeout)
+        return self._client.stream(method, url, **kwargs)
+
+
+@asynccontextmanager
+async def pooled_client(timeout: float = 30.0):
+    """用法同 `async with httpx.AsyncClient(timeout=...)`，但退出时不关闭连接"""
+    yield _TimeoutClient(get_client(), timeout)
+
+
+async def prime(urls: List[str], timeout: float = 5.0) -> Dict[str, bool]:
+    """预先建立到各服务的连接；任何HTTP响应都说明连接已进入连接池"""
+    client = get_client()
+
+    async def connect(url: str) -> bool:
+        try:
+            await client.head(url, timeout=timeout)
+            return True
+        except httpx.HTTPError as e:
+            logger.warning(f"Priming connection to {url} failed: {e}")
+            return False
+
+    results = await asyncio.gather(*(connect(url) for url in urls))
+    return dict(zip(urls, results))
+
+
+async def close():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
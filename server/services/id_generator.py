@@ -0,0 +1,76 @@
+"""
+Snowflake 风格的ID生成器
+
+64位整数ID = 41位毫秒时间戳（自 2024-01-01 起） + 10位工作进程ID + 12位序列号。
+同一进程内严格单调递增；不同工作进程的ID因工作进程ID不同而不会冲突；
+按ID排序即按创建时间排序，可以直接作为分页游标。
+
+工作进程ID取自 ID_WORKER_ID，未设置时取进程号的低10位（fork 出的子进程会重新计算）。
+多进程或多台机器部署时应为每个进程显式配置不同的 ID_WORKER_ID。
+"""
+
+from typing import Optional
+import os
+import threading
+import time
+
+ID_EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+
+WORKER_ID_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_ID_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+TIMESTAMP_SHIFT = WORKER_ID_BITS + SEQUENCE_BITS
+
+
+def _default_worker_id() -> int:
+    configured = os.getenv("ID_WORKER_ID")
+    if configured:
+        worker_id = int(configured)
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"ID_WORKER_ID must be between 0 and {MAX_WORKER_ID}")
+        return worker_id
+    return os.getpid() & MAX_WORKER_ID
+
+
+class SnowflakeGenerator:
+    """线程安全的ID生成器"""
+
+    def __init__(self, worker_id: Optional[int] = None):
+        self._fixed_worker_id = worker_id is not None
+        self.worker_id = worker_id if worker_id is not None else _default_worker_id()
+        self._lock = threading.Lock()
+        self._last_timestamp = -1
+        self._sequence = 0
+
+    def _after_fork(self):
+        """fork 后子进程与父进程的状态相同，需要换一个工作进程ID"""
+        self._lock = threading.Lock()
+        if not self._fixed_worker_id:
+            self.worker_id = _default_worker_id()
+
+    def next_id(self) -> int:
+        with self._lock:
+            timestamp = time.time_ns() // 1_000_000 - ID_EPOCH_MS
+            if timestamp <= self._last_timestamp:
+                # 同一毫秒内（或系统时钟回拨）沿用上次的时间戳，递增序列号；
+                # 序列号用尽时借用下一毫秒，保证单调且不阻塞
+                timestamp = self._last_timestamp
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    timestamp += 1
+            else:
+                self._sequence = 0
+            self._last_timestamp = timestamp
+            return (timestamp << TIMESTAMP_SHIFT) | (self.worker_id << SEQUENCE_BITS) | self._sequence
+
+
+def timestamp_of(snowflake_id: int) -> int:
+    """从ID中取出毫秒级 epoch 时间戳"""
+    return (snowflake_id >> TIMESTAMP_SHIFT) + ID_EPOCH_MS
+
+
+# 全局ID生成器
+id_generator = SnowflakeGenerator()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=id_generator._after_fork)
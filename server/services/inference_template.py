@@ -0,0 +1,54 @@
+"""
+推理工作进程的模板：在 forkserver 进程中导入
+
+forkserver 是单独启动的单线程进程，导入本模块时按 INFERENCE_WORKER_PRELOAD 预加载模型，
+之后所有工作进程（包括重启的）都从它fork出来，以写时复制方式共享模型权重。
+API 进程里有事件循环、I/O 线程和推理线程池，直接从中fork，子进程可能卡在fork时被其他线程持有的锁上。
+"""
+
+from typing import List
+import gc
+import logging
+import os
+
+from services.local_models import model_registry
+
+logger = logging.getLogger(__name__)
+
+# 由 InferenceWorkerPool.start() 在启动 forkserver 前设置，格式同 LOCAL_INFERENCE_PRELOAD（已补全后端）
+PRELOAD_ENV = "INFERENCE_WORKER_PRELOAD"
+
+# 成功预加载的模型（backend:model），工作进程启动后回报给API进程
+preloaded: List[str] = []
+
+# 预加载前 torch 的默认线程数；工作进程未指定线程数时恢复为该值
+torch_threads = 0
+
+
+def _preload():
+    global torch_threads
+    pairs = [item.partition(":")[::2] for item in os.getenv(PRELOAD_ENV, "").split(",") if item]
+    if not pairs:
+        return
+    try:
+        import torch
+        torch_threads = torch.get_num_threads()
+        # 模板进程不能启动 OpenMP 线程池，否则fork出的工作进程中线程池不可用
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+    for backend, model_name in pairs:
+        try:
+            if backend == "onnx":
+                # ONNX Runtime 创建会话时就会启动线程池，只预先导出模型文件，会话在工作进程中创建
+                model_registry.prepare_onnx(model_name)
+            else:
+                model_registry.load(backend, model_name, "cpu")
+            preloaded.append(f"{backend}:{model_name}")
+        except Exception as e:
+            logger.warning(f"Preloading {backend}:{model_name} failed, workers will load it lazily: {e}")
+    # 把已加载的对象移出GC跟踪，避免工作进程里的垃圾回收触碰权重对象所在页面
+    gc.freeze()
+
+
+_preload()
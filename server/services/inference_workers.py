@@ -0,0 +1,262 @@
+"""
+本地模型推理进程池
+
+分词和生成都是CPU密集的同步代码，放在API进程的线程池里会和请求处理争抢GIL。
+工作进程由 forkserver 创建：forkserver 是单线程的模板进程，先加载模型（见 inference_template），
+再为每个工作进程fork一次，模型权重以写时复制方式共享，也不会从多线程的API进程中直接fork。
+请求和结果通过管道传递，父进程定期做健康检查，工作进程崩溃或超时会被重启。
+仅支持提供 forkserver 的平台（Linux/macOS），其他平台退回进程内线程池。
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+
+from services.inference_template import PRELOAD_ENV
+from services.local_models import model_registry
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceWorkerError(Exception):
+    """工作进程推理失败、超时或崩溃"""
+
+
+def _worker_main(conn, threads: int):
+    """工作进程主循环：从管道读取请求，调用本地模型注册表推理"""
+    from services import inference_template
+
+    # 关闭由父进程统一处理
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    threads = threads if threads > 0 else inference_template.torch_threads
+    if threads > 0:
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        kind = message[0]
+        if kind == "stop":
+            break
+        if kind == "ping":
+            conn.send(("pong", os.getpid()))
+        elif kind == "preloaded":
+            conn.send(("ok", inference_template.preloaded))
+        elif kind == "translate":
+            _, backend, model_name, text = message
+            try:
+                conn.send(("ok", model_registry.translate(backend, model_name, text)))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+    os._exit(0)
+
+
+class _Worker:
+    """单个工作进程及其管道（父进程一端）"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.restarts = 0
+        self.served = 0
+
+    def call(self, message: Tuple, timeout: float) -> Tuple:
+        """同步收发一次请求；在I/O线程中调用，等待期间不占用GIL"""
+        self.conn.send(message)
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"worker {self.index} did not reply within {timeout}s")
+        return self.conn.recv()
+
+    def ping(self, timeout: float) -> bool:
+        try:
+            status, _ = self.call(("ping",), timeout)
+            return status == "pong"
+        except (TimeoutError, EOFError, OSError):
+            return False
+
+
+class InferenceWorkerPool:
+    """固定大小的推理进程池，同一时间每个工作进程只处理一个请求"""
+
+    def __init__(self):
+        self._workers: List[_Worker] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._io: Optional[ThreadPoolExecutor] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._context = None
+        self.preloaded: List[str] = []
+        self.request_timeout = 120.0
+        self.health_interval = 30.0
+        self.threads = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self, size: int, preload: List[Tuple[str, str]], request_timeout: float = 120.0,
+                    health_interval: float = 30.0, threads: int = 0) -> bool:
+        """启动模板进程（预加载模型）和工作进程；不支持forkserver时返回False"""
+        if size <= 0 or self.running:
+            return self.running
+        if "forkserver" not in multiprocessing.get_all_start_methods():
+            logger.warning("Platform does not support forkserver, local inference stays in-process")
+            return False
+
+        self.request_timeout = request_timeout
+        self.health_interval = health_interval
+        self.threads = threads
+        loop = asyncio.get_running_loop()
+        # forkserver 继承当前环境变量，在第一个工作进程启动时导入 inference_template 预加载模型
+        os.environ[PRELOAD_ENV] = ",".join(f"{backend}:{model_name}" for backend, model_name in preload)
+        self._context = multiprocessing.get_context("forkserver")
+        self._context.set_forkserver_preload(["services.inference_template"])
+        self._io = ThreadPoolExecutor(max_workers=size + 1, thread_name_prefix="inference-io")
+        self._idle = asyncio.Queue()
+        for index in range(size):
+            worker = _Worker(index)
+            # 第一次启动要等模板进程加载完模型，放到线程池中执行
+            await loop.run_in_executor(None, self._spawn, worker)
+            self._workers.append(worker)
+            self._idle.put_nowait(worker)
+
+        try:
+            _, self.preloaded = await loop.run_in_executor(self._io, self._workers[0].call, ("preloaded",), 10.0)
+        except (TimeoutError, EOFError, OSError) as e:
+            logger.warning(f"Could not read preloaded models from inference worker: {e}")
+        for backend, model_name in preload:
+            if f"{backend}:{model_name}" not in self.preloaded:
+                logger.warning(f"Preloading {backend}:{model_name} failed, workers will load it lazily")
+        self._health_task = asyncio.create_task(self._health_loop())
+        logger.info(f"Started {size} local inference workers (preloaded: {', '.join(self.preloaded) or 'none'})")
+        return True
+
+    def _spawn(self, worker: _Worker):
+        parent_conn, child_conn = self._context.Pipe()
+        worker.process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.threads),
+            name=f"inference-worker-{worker.index}",
+            daemon=True
+        )
+        worker.process.start()
+        child_conn.close()
+        worker.conn = parent_conn
+
+    def _stop_process(self, worker: _Worker):
+        if worker.process is not None and worker.process.is_alive():
+            worker.process.kill()
+        if worker.process is not None:
+            worker.process.join(timeout=1)
+        if worker.conn is not None:
+            worker.conn.close()
+            worker.conn = None
+
+    def _restart(self, worker: _Worker, reason: str):
+        """终止并重新启动工作进程；join 和等待 forkserver 都会阻塞，需在线程池中调用"""
+        logger.warning(f"Restarting inference worker {worker.index}: {reason}")
+        self._stop_process(worker)
+        self._spawn(worker)
+        worker.restarts += 1
+
+    async def translate(self, backend: str, model_name: str, text: str) -> str:
+        """在空闲工作进程中执行一次翻译"""
+        if not self.running:
+            raise InferenceWorkerError("Inference worker pool is not running")
+        loop = asyncio.get_running_loop()
+        worker = await self._idle.get()
+        try:
+            status, payload = await loop.run_in_executor(
+                self._io, worker.call, ("translate", backend, model_name, text), self.request_timeout
+            )
+        except (TimeoutError, EOFError, OSError) as e:
+            # 崩溃或卡住的进程直接替换，请求本身按失败处理
+            reason = str(e) or type(e).__name__
+            await loop.run_in_executor(None, self._restart, worker, reason)
+            raise InferenceWorkerError(f"Inference worker {worker.index} failed: {reason}")
+        finally:
+            self._idle.put_nowait(worker)
+        worker.served += 1
+        if status != "ok":
+            raise InferenceWorkerError(payload)
+        return payload
+
+    async def _health_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.health_interval)
+            # 只检查空闲进程；忙碌进程出错会在 translate 中被发现
+            for _ in range(self._idle.qsize()):
+                worker = self._idle.get_nowait()
+                try:
+                    healthy = worker.process.is_alive() and await loop.run_in_executor(self._io, worker.ping, 5.0)
+                    if not healthy:
+                        await loop.run_in_executor(None, self._restart, worker, "health check failed")
+                except Exception as e:
+                    logger.error(f"Inference worker health check error: {e}")
+                finally:
+                    self._idle.put_nowait(worker)
+
+    async def shutdown(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for worker in self._workers:
+            try:
+                worker.conn.send(("stop",))
+            except (OSError, AttributeError):
+                pass
+        deadline = time.monotonic() + 2
+        for worker in self._workers:
+            worker.process.join(timeout=max(0.0, deadline - time.monotonic()))
+            self._stop_process(worker)
+        self._workers = []
+        if self._io is not None:
+            self._io.shutdown(wait=False)
+            self._io = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": [
+                {
+                    "index": worker.index,
+                    "pid": worker.process.pid if worker.process else None,
+                    "alive": bool(worker.process and worker.process.is_alive()),
+                    "served": worker.served,
+                    "restarts": worker.restarts
+                }
+                for worker in self._workers
+            ],
+            "idle": self._idle.qsize() if self._idle is not None else 0,
+            "preloaded": self.preloaded
+        }
+
+
+def parse_preload(value: str, default_backend: str) -> List[Tuple[str, str]]:
+    """解析 LOCAL_INFERENCE_PRELOAD，格式 "backend:model,model2"，省略后端时使用默认后端"""
+    pairs = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        backend, sep, model_name = item.partition(":")
+        if not sep:
+            backend, model_name = default_backend, item
+        pairs.append((backend.strip(), model_name.strip()))
+    return pairs
+
+
+# 全局推理进程池（在应用 lifespan 中启动）
+inference_pool = InferenceWorkerPool()
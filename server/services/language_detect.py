@@ -0,0 +1,171 @@
+"""
+轻量级语言识别：文字系统快速判断 + 字符三元组(trigram)频率画像
+覆盖 models.LanguageCode 中的全部语言，无外部依赖
+"""
+
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import re
+
+# 每种语言的画像保留的trigram数量
+PROFILE_SIZE = 300
+
+# 样本只用于构建trigram画像，选用各语言最常见的功能词和句子
+_SAMPLES = {
+    "en": "the and of to in is that it for you was with on as have be at this are not but they from his by or which she will one all would there their what about when if who can out so up said we said than them then these some time into only other could new people also like how because just know your more any most day hello everyone thanks please good great think really want need very much here where why does did has had been were my me our us",
+    "es": "de la que el en y los del se las por un para con no una su al lo como más pero sus le ya o este sí porque esta entre cuando muy sin sobre también me hasta hay donde quien desde todo nos durante todos uno les ni contra otros ese eso ante ellos e esto mí antes algunos qué unos yo otro otras otra él tanto esa estos mucho quienes nada muchos cual poco ella estar estas algunas algo nosotros mi mis tú te ti tu tus ellas nosotras vosotros vosotras os mío mía está estoy",
+    "fr": "de la le et les des en un du une que est pour qui dans par sur pas plus ce il au ne avec se son sont mais comme ou été aux elle nous vous je tout cette fait ont bien leur sa ses peut aussi deux même entre sans très avoir être être ces dont lui où donc encore chez notre votre moi toi était faire quand cela ici ça c'est",
+    "de": "der die und in den von zu das mit sich des auf für ist im dem nicht ein eine als auch es an werden aus er hat dass sie nach wird bei einer um am sind noch wie einem über einen so zum war haben nur oder aber vor zur bis mehr durch man sein wurde sei ich wir ihr können diese schon wenn gibt sehr hier über für größer",
+    "it": "di che il la e a per un in è non del una le sono con da si al della dei più come ma anche gli questo ci lo ho nel alla delle se mi ha nella io tu lei noi voi loro sul perché quando molto già cosa sempre ancora tutto fatto essere stato questa quello dove oggi grazie bene",
+    "pt": "de que o a e do da em um para é com não uma os no se na por mais as dos como mas foi ao ele das tem à seu sua ou ser quando muito há nos já está eu também só pelo pela até isso ela entre era depois sem mesmo aos ter seus quem nas me esse eles estão você tinha foram essa num nem suas meu às minha têm numa pelos elas havia seja qual será nós tenho lhe deles essas esses pelas este fosse dele não são obrigado estou desta deste fazer parte comunidade feliz agora então ainda coisa muito bom dia",
+    "nl": "de en van het een in is dat op te zijn voor met die niet aan er om ook als dan bij of uit nog maar door over zo naar wat heeft hij ze je wordt werd dit tot kan worden moet geen deze al meer veel ik wij jullie hun onze zij was waren heb hebben goed dank",
+    "sv": "och i att det som en på är av för med till den har de inte om ett han men var jag sig från vi så kan man när år säger hon under också efter eller nu sina där vid mot ska skulle kommer ut får finns vara hade alla andra mycket än här då sedan över bara in blir upp även vad få två vill ha många hur mer går sverige kronor detta nya procent skall hans utan sin någon första fick",
+    "da": "og i at det er en til på de med for af den som ikke har et han var jeg men om der sig så kan vi fra hun du man skal også efter når eller nu være blev ved hvor over alle mod ud havde da under min kun mig sin hvis dem meget disse end her mange hvad noget bliver hans nogle selv være jo dansk tak",
+    "no": "og i det er som på en til av at med for har de ikke den var et han om jeg men seg fra så kan vi ble etter hun du man skal også eller nå være ved hvor over alle mot ut hadde da under min bare meg sin hvis dem mye disse enn her mange hva noe blir hans noen selv norsk takk ikkje kva",
+    "fi": "ja on ei se että hän oli ovat mutta kun niin kuin myös tai jos vain ole sen hänen olla mitä jo sitä nyt koska ne he me te minä sinä tämä tuo joka mikä kaikki sitten voi vielä paljon siitä tässä olen olet olemme kiitos suomi hyvä päivää kaikille meille teille heille tämän talossa kotona kanssa ilman hyvin tänään huomenna eilen kiinnostava ihmiset sanoa tehdä mennä tulla nähdä",
+    "pl": "i w nie na się z do to że jest o jak a ale po co tak za od już tylko jego jej przez może przy ich dla są być by było ten ta te czy był gdy który która które także bardzo jeszcze wszystko można teraz jestem jesteś dziękuję dzień dobry proszę",
+    "cs": "a v se na je že to s z do o ve k pro jako by ale jsem jsou tak po jeho které který která také být bylo jen už při od když nebo jak než si mi tím již může před podle aby ani děkuji dobrý den prosím ještě všechno",
+    "hu": "a az és hogy nem is egy meg van de csak már mint ez el volt még ki be mi fel ha azt vagy kell lesz nagyon most sem után itt ott minden amely aki ami köszönöm jó napot kérem szerint között alatt",
+    "tr": "ve bir bu da de için ile olarak çok daha en gibi ama kadar sonra ancak her olan var yok ben sen biz siz onlar şey mi mı değil nasıl neden çünkü teşekkür ederim merhaba lütfen evet hayır güzel büyük",
+    "vi": "và của là có không một những được cho trong người này với các đã để khi đến thì từ như nhưng ra làm cũng lại năm rất nhiều về sẽ còn đó nào tôi bạn chúng ta họ xin chào cảm ơn việt nam",
+    "id": "yang dan di ini itu dengan untuk tidak dari dalam akan pada juga ke karena ada mereka kami kita saya anda bisa sudah telah lebih oleh sebagai atau saat harus seperti hanya tetapi bagaimana terima kasih selamat pagi banyak",
+}
+
+# 单一语言专用的文字系统：(起始码位, 结束码位, 语言)
+_SCRIPT_RANGES = (
+    (0x3040, 0x30FF, "ja"),   # 平假名、片假名
+    (0xAC00, 0xD7AF, "ko"),   # 韩文音节
+    (0x1100, 0x11FF, "ko"),   # 韩文字母
+    (0x0370, 0x03FF, "el"),   # 希腊字母
+    (0x0590, 0x05FF, "he"),   # 希伯来字母
+    (0x0600, 0x06FF, "ar"),   # 阿拉伯字母
+    (0x0750, 0x077F, "ar"),
+    (0x0E00, 0x0E7F, "th"),   # 泰文
+    (0x0900, 0x097F, "hi"),   # 天城文
+    (0x0400, 0x04FF, "ru"),   # 西里尔字母（还需经 _cyrillic_language 确认）
+    (0x4E00, 0x9FFF, "zh"),   # CJK统一表意文字
+    (0x3400, 0x4DBF, "zh"),
+)
+
+# 西里尔字母由俄语、乌克兰语、保加利亚语、塞尔维亚语等共用：
+# 只有出现俄语特有字母、且没有其他语言特有字母时才判定为俄语，否则交给翻译服务识别
+_RUSSIAN_LETTERS = frozenset("ыэё")
+_NON_RUSSIAN_CYRILLIC = frozenset("іїєґўђјљњћџѓќѕ")
+# 硬音符号在保加利亚语中很常见，在俄语中很少出现
+_MAX_RUSSIAN_HARD_SIGN_RATIO = 0.02
+
+# 区分度高的字母，出现时给对应语言加分
+_CHAR_HINTS = {
+    "ã": ("pt",), "õ": ("pt",), "ç": ("pt", "fr", "tr"),
+    "ñ": ("es",), "¿": ("es",), "¡": ("es",),
+    "ß": ("de",), "ü": ("de", "tr", "hu"),
+    "æ": ("da", "no"), "ø": ("da", "no"), "å": ("sv", "da", "no"),
+    "ä": ("fi", "sv", "de"), "ö": ("fi", "sv", "de", "hu", "tr"),
+    "ő": ("hu",), "ű": ("hu",),
+    "ł": ("pl",), "ą": ("pl",), "ę": ("pl",), "ś": ("pl",), "ź": ("pl",), "ż": ("pl",), "ń": ("pl",),
+    "ř": ("cs",), "ě": ("cs",), "ů": ("cs",), "č": ("cs",), "š": ("cs",), "ž": ("cs",),
+    "ğ": ("tr",), "ş": ("tr",), "ı": ("tr",),
+    "đ": ("vi",), "ơ": ("vi",), "ư": ("vi",), "ạ": ("vi",), "ả": ("vi",), "ế": ("vi",), "ộ": ("vi",), "ờ": ("vi",),
+    "ë": ("nl",), "è": ("fr", "it"), "ê": ("fr", "pt"), "à": ("fr", "it", "pt"), "ò": ("it",), "ì": ("it",),
+}
+_HINT_WEIGHT = 0.5
+
+_NON_LETTERS = re.compile(r"[^\w']+|\d+|_+")
+
+
+def _trigrams(text: str) -> Counter:
+    counts = Counter()
+    for word in _NON_LETTERS.sub(" ", text.lower()).split():
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            counts[padded[i:i + 3]] += 1
+    return counts
+
+
+def _build_profiles() -> Dict[str, Dict[str, float]]:
+    """按频率排名为每种语言构建trigram权重表，排名越靠前权重越高"""
+    profiles = {}
+    for lang, sample in _SAMPLES.items():
+        ranked = [gram for gram, _ in _trigrams(sample).most_common(PROFILE_SIZE)]
+        profiles[lang] = {gram: 1.0 - rank / len(ranked) for rank, gram in enumerate(ranked)}
+    return profiles
+
+
+_PROFILES = _build_profiles()
+
+
+def _cyrillic_language(text: str, cyrillic_letters: int, letters: int) -> Tuple[Optional[str], float]:
+    """西里尔字母文本：确认是俄语时返回 ("ru", 置信度)，否则返回 (None, 0.0)"""
+    lowered = set(text.lower())
+    if lowered & _NON_RUSSIAN_CYRILLIC or not lowered & _RUSSIAN_LETTERS:
+        return None, 0.0
+    if text.lower().count("ъ") / cyrillic_letters > _MAX_RUSSIAN_HARD_SIGN_RATIO:
+        return None, 0.0
+    return "ru", cyrillic_letters / letters
+
+
+def _script_language(text: str) -> Optional[Tuple[Optional[str], float]]:
+    """按文字系统判断语言；拉丁字母文本返回None，无法区分的西里尔字母文本返回 (None, 0.0)"""
+    counts = Counter()
+    letters = 0
+    for ch in text:
+        if not ch.isalpha():
+            continue
+        letters += 1
+        code = ord(ch)
+        if code < 0x0370:
+            continue
+        for start, end, lang in _SCRIPT_RANGES:
+            if start <= code <= end:
+                counts[lang] += 1
+                break
+    if not letters or not counts:
+        return None
+    # 日文通常混用汉字和假名，只要出现假名就判定为日文
+    if counts["ja"]:
+        return "ja", min(1.0, (counts["ja"] + counts["zh"]) / letters)
+    lang, hits = counts.most_common(1)[0]
+    if hits / letters < 0.3:
+        return None
+    if lang == "ru":
+        return _cyrillic_language(text, hits, letters)
+    return lang, hits / letters
+
+
+# 低于该置信度的识别结果视为无法判断
+MIN_CONFIDENCE = 0.2
+
+# 拉丁字母等文字的trigram少于该数量时（如 "Hola"、"Merci beaucoup"）画像对比不可靠，视为无法判断
+MIN_TRIGRAMS = 20
+
+
+@lru_cache(maxsize=4096)
+def detect_language(text: str) -> Tuple[Optional[str], float]:
+    """识别文本语言，返回 (语言代码, 置信度)；无法判断时语言代码为None"""
+    sample = text[:1000]
+    script = _script_language(sample)
+    if script:
+        return script
+
+    grams = _trigrams(sample)
+    total = sum(grams.values())
+    if total < MIN_TRIGRAMS:
+        return None, 0.0
+    scores = {
+        lang: sum(profile.get(gram, 0.0) * count for gram, count in grams.items()) / total
+        for lang, profile in _PROFILES.items()
+    }
+    for ch in set(sample.lower()):
+        langs = _CHAR_HINTS.get(ch)
+        if langs:
+            for lang in langs:
+                scores[lang] += _HINT_WEIGHT / len(langs)
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    best_lang, best_score = ranked[0]
+    if best_score <= 0:
+        return None, 0.0
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+    # 置信度取决于领先第二名的幅度
+    confidence = (best_score - runner_up) / best_score
+    return best_lang, round(confidence, 3)
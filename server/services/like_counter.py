@@ -0,0 +1,184 @@
+"""
+写回式点赞计数
+
+点赞不直接修改帖子，而是累加到分片的内存计数器中，后台任务定期把各帖子的
+增量批量写回帖子存储。热门帖子的并发点赞分散在不同分片上，不会集中竞争同一把锁；
+读取点赞数时返回 已写回的值 + 未写回的增量。
+
+按用户去重：每个帖子的点赞用户ID保存在有序整数数组中（每个用户8字节），
+非数字ID退回到集合。
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Callable, Dict, Optional, Set
+import asyncio
+import logging
+import random
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def _numeric_id(user_id: str) -> Optional[int]:
+    """可以存入整数数组的用户ID返回整数，否则返回None（isdigit() 对 "²" 等非ASCII数字也为True）"""
+    if user_id.isascii() and user_id.isdigit() and int(user_id) < 2 ** 64:
+        return int(user_id)
+    return None
+
+
+class LikerSet:
+    """紧凑的点赞用户集合"""
+
+    __slots__ = ("_ids", "_others")
+
+    def __init__(self):
+        self._ids = array("Q")
+        self._others: Optional[Set[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._ids) + (len(self._others) if self._others else 0)
+
+    def __contains__(self, user_id: str) -> bool:
+        number = _numeric_id(user_id)
+        if number is not None:
+            index = bisect_left(self._ids, number)
+            return index < len(self._ids) and self._ids[index] == number
+        return bool(self._others) and user_id in self._others
+
+    def add(self, user_id: str) -> bool:
+        """加入用户，已存在时返回False"""
+        number = _numeric_id(user_id)
+        if number is not None:
+            index = bisect_left(self._ids, number)
+            if index < len(self._ids) and self._ids[index] == number:
+                return False
+            self._ids.insert(index, number)
+            return True
+        if self._others is None:
+            self._others = set()
+        if user_id in self._others:
+            return False
+        self._others.add(user_id)
+        return True
+
+    def discard(self, user_id: str) -> bool:
+        """移除用户，不存在时返回False"""
+        number = _numeric_id(user_id)
+        if number is not None:
+            index = bisect_left(self._ids, number)
+            if index < len(self._ids) and self._ids[index] == number:
+                del self._ids[index]
+                return True
+            return False
+        if self._others and user_id in self._others:
+            self._others.remove(user_id)
+            return True
+        return False
+
+
+class _Shard:
+    __slots__ = ("lock", "pending")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending: Dict[int, int] = {}
+
+
+class LikeCounter:
+    """分片累加点赞增量，定期批量写回"""
+
+    def __init__(self, shards: int = 8, flush_interval: float = 1.0):
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._likers: Dict[int, LikerSet] = {}
+        self._likers_lock = threading.Lock()
+        self.flush_interval = flush_interval
+        self._apply: Optional[Callable[[Dict[int, int]], None]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+
+    def bind(self, apply: Callable[[Dict[int, int]], None]):
+        """设置写回函数，参数为 {帖子ID: 增量}"""
+        self._apply = apply
+
+    def _ensure_flusher(self):
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+            except RuntimeError:
+                # 没有运行中的事件循环（例如同步调用），由调用方手动 flush
+                pass
+
+    def add(self, post_id: int, delta: int):
+        # 随机选择分片：同一热门帖子的点赞分散到多个分片
+        shard = self._shards[random.randrange(len(self._shards))]
+        with shard.lock:
+            shard.pending[post_id] = shard.pending.get(post_id, 0) + delta
+        self._ensure_flusher()
+
+    def pending(self, post_id: int) -> int:
+        """未写回的增量"""
+        return sum(shard.pending.get(post_id, 0) for shard in self._shards)
+
+    def toggle(self, post_id: int, user_id: str, like: bool) -> bool:
+        """按用户去重地点赞/取消点赞，状态发生变化时返回True"""
+        with self._likers_lock:
+            likers = self._likers.get(post_id)
+            if like:
+                if likers is None:
+                    likers = self._likers[post_id] = LikerSet()
+                changed = likers.add(user_id)
+            else:
+                changed = likers.discard(user_id) if likers is not None else False
+        if changed:
+            self.add(post_id, 1 if like else -1)
+        return changed
+
+    def has_liked(self, post_id: int, user_id: str) -> bool:
+        likers = self._likers.get(post_id)
+        return likers is not None and user_id in likers
+
+    def forget(self, post_id: int):
+        """帖子删除时丢弃未写回的增量和点赞用户"""
+        for shard in self._shards:
+            with shard.lock:
+                shard.pending.pop(post_id, None)
+        with self._likers_lock:
+            self._likers.pop(post_id, None)
+
+    def flush(self) -> Dict[int, int]:
+        """取出所有分片的增量并写回，返回写回的增量"""
+        totals: Dict[int, int] = {}
+        for shard in self._shards:
+            with shard.lock:
+                pending, shard.pending = shard.pending, {}
+            for post_id, delta in pending.items():
+                totals[post_id] = totals.get(post_id, 0) + delta
+        totals = {post_id: delta for post_id, delta in totals.items() if delta}
+        if totals and self._apply is not None:
+            self._apply(totals)
+            self.flushes += 1
+        return totals
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Like counter flush failed: {str(e)}")
+
+    async def stop(self):
+        """停止后台任务并写回剩余增量"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "shards": len(self._shards),
+            "pending_posts": len({post_id for shard in self._shards for post_id in shard.pending}),
+            "tracked_posts": len(self._likers),
+            "flushes": self.flushes
+        }
@@ -0,0 +1,179 @@
+"""
+本地模型注册表：缓存已加载的本地翻译模型，避免每次请求重新加载
+
+ONNX 后端把 MarianMT 等 Seq2Seq 模型导出为 ONNX 并做动态 int8 量化，
+通过 ONNX Runtime 在 CPU 上推理。需要安装 optimum[onnxruntime]。
+"""
+
+from typing import Any, Dict, Tuple
+import glob
+import logging
+import os
+import shutil
+import threading
+
+logger = logging.getLogger(__name__)
+
+# ONNX 导出和量化结果的缓存目录
+ONNX_CACHE_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "onnx_models"))
+
+
+def _quantization_config(target: str):
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    factories = {
+        "avx2": AutoQuantizationConfig.avx2,
+        "avx512": AutoQuantizationConfig.avx512,
+        "avx512_vnni": AutoQuantizationConfig.avx512_vnni,
+        "arm64": AutoQuantizationConfig.arm64
+    }
+    if target not in factories:
+        raise ValueError(f"Unsupported ONNX quantization target: {target}")
+    return factories[target](is_static=False, per_channel=False)
+
+
+def _export_onnx_model(model_name: str, quantization: str) -> str:
+    """导出（并量化）ONNX模型，返回模型目录；已导出时直接复用"""
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTQuantizer
+    from transformers import AutoTokenizer
+
+    base_dir = os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "__"))
+    export_dir = os.path.join(base_dir, "fp32")
+    if not os.path.exists(os.path.join(export_dir, "config.json")):
+        logger.info(f"Exporting {model_name} to ONNX: {export_dir}")
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+        model.save_pretrained(export_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(export_dir)
+
+    if quantization == "none":
+        return export_dir
+
+    quantized_dir = os.path.join(base_dir, f"int8-{quantization}")
+    if not os.path.exists(os.path.join(quantized_dir, "config.json")):
+        logger.info(f"Quantizing {model_name} with dynamic int8 ({quantization})")
+        config = _quantization_config(quantization)
+        for onnx_file in sorted(glob.glob(os.path.join(export_dir, "*.onnx"))):
+            quantizer = ORTQuantizer.from_pretrained(export_dir, file_name=os.path.basename(onnx_file))
+            quantizer.quantize(save_dir=quantized_dir, quantization_config=config)
+        # 量化后的文件名带 _quantized 后缀，改回原名以便按默认文件名加载
+        for quantized_file in glob.glob(os.path.join(quantized_dir, "*_quantized.onnx")):
+            os.replace(quantized_file, quantized_file.replace("_quantized.onnx", ".onnx"))
+        for name in os.listdir(export_dir):
+            if not name.endswith(".onnx") and not os.path.exists(os.path.join(quantized_dir, name)):
+                source = os.path.join(export_dir, name)
+                if os.path.isfile(source):
+                    shutil.copy(source, quantized_dir)
+    return quantized_dir
+
+
+class LocalModelRegistry:
+    """进程内的本地模型缓存，键为 (后端, 模型名)"""
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, str], Any] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+
+    def _lock_for(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._registry_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def is_loaded(self, backend: str, model_name: str) -> bool:
+        return (backend, model_name) in self._models
+
+    def loaded_models(self):
+        return [f"{backend}:{model_name}" for backend, model_name in self._models]
+
+    def prepare_onnx(self, model_name: str) -> str:
+        """只导出并量化ONNX模型文件（有缓存时直接返回目录），不创建推理会话"""
+        return _export_onnx_model(model_name, os.getenv("ONNX_QUANTIZATION", "avx2"))
+
+    def get_onnx(self, model_name: str):
+        """加载ONNX模型，返回 (tokenizer, model)；同一模型只加载一次"""
+        key = ("onnx", model_name)
+        if key in self._models:
+            return self._models[key]
+        with self._lock_for(key):
+            if key not in self._models:
+                import onnxruntime
+                from optimum.onnxruntime import ORTModelForSeq2SeqLM
+                from transformers import AutoTokenizer
+
+                model_dir = self.prepare_onnx(model_name)
+                session_options = onnxruntime.SessionOptions()
+                session_options.intra_op_num_threads = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))
+                session_options.inter_op_num_threads = int(os.getenv("ONNX_INTER_OP_THREADS", "0"))
+                session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+                model = ORTModelForSeq2SeqLM.from_pretrained(
+                    model_dir,
+                    provider="CPUExecutionProvider",
+                    session_options=session_options
+                )
+                tokenizer = AutoTokenizer.from_pretrained(model_dir)
+                self._models[key] = (tokenizer, model)
+                logger.info(f"Loaded ONNX model {model_name} from {model_dir}")
+        return self._models[key]
+
+    def get_transformers(self, model_name: str, device: str = None):
+        """加载Transformers翻译管道；同一模型只加载一次"""
+        key = ("transformers", model_name)
+        if key in self._models:
+            return self._models[key]
+        with self._lock_for(key):
+            if key not in self._models:
+                import torch
+                from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+                from transformers.pipelines import pipeline
+
+                if device is None:
+                    device = "mps" if torch.backends.mps.is_available() else "cpu"
+                # 加载模型和分词器 - 修复meta tensor问题
+                tokenizer = AutoTokenizer.from_pretrained(model_name)
+                model = AutoModelForSeq2SeqLM.from_pretrained(
+                    model_name,
+                    torch_dtype=torch.float32,  # 指定数据类型
+                    device_map=None  # 不使用自动设备映射
+                )
+                model = model.to(device)
+                model.eval()
+                self._models[key] = pipeline(
+                    "translation",
+                    model=model,
+                    tokenizer=tokenizer,
+                    device=0 if device == "mps" else -1
+                )
+                logger.info(f"Loaded Transformers model {model_name} on {device}")
+        return self._models[key]
+
+    def translate_transformers(self, model_name: str, text: str, max_length: int = 512) -> str:
+        """使用Transformers管道执行翻译（同步，应在线程池或工作进程中调用）"""
+        translator = self.get_transformers(model_name)
+        result = translator(text, max_length=max_length)
+        return result[0]['translation_text'] if result else text
+
+    def translate(self, backend: str, model_name: str, text: str) -> str:
+        """按后端名分派翻译"""
+        if backend == "onnx":
+            return self.translate_onnx(model_name, text)
+        if backend == "transformers":
+            return self.translate_transformers(model_name, text)
+        raise ValueError(f"Unsupported local backend: {backend}")
+
+    def load(self, backend: str, model_name: str, device: str = None):
+        """预加载模型（不执行推理）"""
+        if backend == "onnx":
+            return self.get_onnx(model_name)
+        if backend == "transformers":
+            return self.get_transformers(model_name, device=device)
+        raise ValueError(f"Unsupported local backend: {backend}")
+
+    def translate_onnx(self, model_name: str, text: str, max_length: int = 512) -> str:
+        """使用ONNX Runtime执行翻译（同步，应在线程池或工作进程中调用）"""
+        tokenizer, model = self.get_onnx(model_name)
+        inputs = tokenizer([text], return_tensors="pt", truncation=True, max_length=max_length)
+        outputs = model.generate(**inputs, max_length=max_length)
+        return tokenizer.decode(outputs[0], skip_special_tokens=True)
+
+
+# 全局模型注册表
+model_registry = LocalModelRegistry()
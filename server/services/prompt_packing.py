@@ -0,0 +1,77 @@
+"""
+多文本打包：把多条短文本合并为一个结构化的LLM翻译请求，并解析校验逐条结果
+"""
+
+from typing import List, Optional, Sequence
+import json
+import re
+
+from services.segmenter import estimate_tokens
+
+# 每个打包请求最多包含的文本条数和输入token数
+MAX_PACK_ITEMS = 20
+MAX_PACK_TOKENS = 1500
+
+PACKED_SYSTEM_PROMPT = (
+    "You are a professional translator. You receive a JSON object whose \"segments\" array contains "
+    "numbered texts. Translate every text to {target_lang}{source_hint}, maintaining the original tone. "
+    "Reply with a JSON object of the form {{\"translations\": [\"...\", ...]}} containing exactly "
+    "{count} strings in the same order as the input. Do not merge, split or omit segments and add no explanations."
+)
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def pack_texts(texts: Sequence[str], max_items: int = MAX_PACK_ITEMS, max_tokens: int = MAX_PACK_TOKENS) -> List[List[int]]:
+    """按条数和token上限把文本分组，返回每组的文本下标；超长文本单独成组"""
+    groups: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def build_packed_messages(texts: Sequence[str], target_lang: str, source_lang: str = "auto"):
+    """构造打包请求的 (系统提示, 用户内容)"""
+    source_hint = f" from {source_lang}" if source_lang != "auto" else ""
+    system = PACKED_SYSTEM_PROMPT.format(target_lang=target_lang, source_hint=source_hint, count=len(texts))
+    user = json.dumps(
+        {"segments": [{"id": i + 1, "text": text} for i, text in enumerate(texts)]},
+        ensure_ascii=False
+    )
+    return system, user
+
+
+def parse_packed_output(output: str, expected: int) -> Optional[List[str]]:
+    """解析并校验打包翻译结果，条数或格式不符时返回None"""
+    cleaned = _CODE_FENCE.sub("", output.strip())
+    start = min((i for i in (cleaned.find("{"), cleaned.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        return None
+    try:
+        data, _ = json.JSONDecoder().raw_decode(cleaned[start:])
+    except json.JSONDecodeError:
+        return None
+
+    if isinstance(data, dict):
+        data = data.get("translations")
+    if not isinstance(data, list) or len(data) != expected:
+        return None
+
+    translations = []
+    for item in data:
+        # 兼容模型返回 {"id": 1, "text": "..."} 形式
+        if isinstance(item, dict):
+            item = item.get("text")
+        if not isinstance(item, str) or not item.strip():
+            return None
+        translations.append(item.strip())
+    return translations
@@ -0,0 +1,85 @@
+"""
+自适应服务路由：按 (服务, 语言对, 文本长度档位) 统计EWMA延迟和成功率，
+auto 模式下优先选择期望耗时最低的服务，并保留少量探索流量刷新过期统计
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+import random
+import time
+
+# 文本长度档位上限（字符数）
+SIZE_BUCKETS = ((200, "short"), (1000, "medium"))
+
+
+@dataclass
+class RouteStats:
+    latency: float = 0.0  # EWMA延迟（秒），只统计成功请求
+    success_rate: float = 1.0  # EWMA成功率
+    samples: int = 0
+    updated_at: float = 0.0
+
+
+class ProviderRouter:
+    def __init__(self, alpha: float = 0.2, exploration_rate: float = 0.05, stale_after: float = 600.0):
+        self.alpha = alpha
+        self.exploration_rate = exploration_rate
+        self.stale_after = stale_after
+        self._stats: Dict[Tuple[str, str, str, str], RouteStats] = {}
+
+    @staticmethod
+    def size_bucket(chars: int) -> str:
+        for limit, name in SIZE_BUCKETS:
+            if chars <= limit:
+                return name
+        return "long"
+
+    def record(self, provider: str, source_lang: str, target_lang: str, chars: int, latency: float, ok: bool):
+        """记录一次调用结果"""
+        key = (provider, source_lang, target_lang, self.size_bucket(chars))
+        stats = self._stats.setdefault(key, RouteStats())
+        if stats.samples == 0:
+            stats.success_rate = 1.0 if ok else 0.0
+            stats.latency = latency if ok else 0.0
+        else:
+            stats.success_rate += self.alpha * ((1.0 if ok else 0.0) - stats.success_rate)
+            if ok:
+                stats.latency = latency if stats.latency == 0.0 else stats.latency + self.alpha * (latency - stats.latency)
+        stats.samples += 1
+        stats.updated_at = time.monotonic()
+
+    def _expected_cost(self, stats: RouteStats) -> float:
+        # 期望耗时 = 延迟 / 成功率（失败需要重试其他服务）
+        return (stats.latency or 1.0) / max(stats.success_rate, 0.05)
+
+    def rank(self, candidates: Sequence[str], source_lang: str, target_lang: str, chars: int) -> List[str]:
+        """返回按期望耗时排序的服务列表；没有统计的服务排在最前以便采样"""
+        bucket = self.size_bucket(chars)
+        now = time.monotonic()
+        known, unknown, stale = [], [], []
+        for provider in candidates:
+            stats = self._stats.get((provider, source_lang, target_lang, bucket))
+            if stats is None or stats.samples == 0:
+                unknown.append(provider)
+                continue
+            known.append((self._expected_cost(stats), provider))
+            if now - stats.updated_at > self.stale_after:
+                stale.append(provider)
+        ordered = unknown + [provider for _, provider in sorted(known)]
+
+        # 探索：偶尔把一个过期（或随机的非最优）服务提到最前
+        if len(ordered) > 1 and not unknown and random.random() < self.exploration_rate:
+            explore = random.choice(stale or ordered[1:])
+            ordered.remove(explore)
+            ordered.insert(0, explore)
+        return ordered
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            "/".join(key): {
+                "latency_ms": round(stats.latency * 1000, 1),
+                "success_rate": round(stats.success_rate, 3),
+                "samples": stats.samples
+            }
+            for key, stats in self._stats.items()
+        }
@@ -0,0 +1,161 @@
+"""
+翻译服务调度：按服务限制并发请求数和每个时间窗口内的字符数，
+排队超时则拒绝，并遵守服务返回的 Retry-After
+"""
+
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional, Tuple
+import asyncio
+import os
+import time
+
+# 默认限制：(最大并发请求数, 每窗口字符数, 0表示不限)
+DEFAULT_LIMITS: Dict[str, Tuple[int, int]] = {
+    "openai": (8, 0),
+    "azure": (8, 0),
+    "google": (8, 0),
+    "deepl": (8, 0),
+    "local": (2, 0)
+}
+
+
+class ProviderUnavailable(Exception):
+    """服务暂时不可用（限流冷却中或排队超时），应直接尝试下一个服务"""
+
+
+class ProviderRateLimited(ProviderUnavailable):
+    """服务返回429，retry_after为建议的等待秒数"""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"{provider} rate limited, retry after {retry_after:.1f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str], default: float = 30.0) -> float:
+    """解析Retry-After头（秒数或HTTP日期）"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class ProviderGate:
+    """单个翻译服务的准入控制"""
+
+    def __init__(self, name: str, max_in_flight: int, chars_per_window: int = 0,
+                 window_seconds: float = 60.0, queue_timeout: float = 5.0):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.chars_per_window = chars_per_window
+        self.window_seconds = window_seconds
+        self.queue_timeout = queue_timeout
+        self.blocked_until = 0.0
+        self.in_flight = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._usage: Deque[Tuple[float, int]] = deque()  # (时间, 字符数)
+        self._used_chars = 0
+
+    def _expire_usage(self, now: float):
+        cutoff = now - self.window_seconds
+        while self._usage and self._usage[0][0] <= cutoff:
+            self._used_chars -= self._usage.popleft()[1]
+
+    def block_for(self, seconds: float):
+        """收到Retry-After后暂停向该服务发送请求"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        raise ProviderUnavailable(f"{self.name} {reason}")
+
+    async def _wait_for_budget(self, chars: int, deadline: float):
+        """等待字符预算，超过截止时间则拒绝"""
+        # 单个请求超过整个窗口预算时只能单独放行
+        chars = min(chars, self.chars_per_window)
+        while True:
+            now = time.monotonic()
+            self._expire_usage(now)
+            if self._used_chars + chars <= self.chars_per_window:
+                self._usage.append((now, chars))
+                self._used_chars += chars
+                return
+            wait = self._usage[0][0] + self.window_seconds - now
+            if now + wait > deadline:
+                self._reject("character budget exhausted")
+            await asyncio.sleep(wait)
+
+    @asynccontextmanager
+    async def admit(self, chars: int):
+        """获取一个请求名额，排队超过 queue_timeout 时抛出 ProviderUnavailable"""
+        now = time.monotonic()
+        if now < self.blocked_until:
+            self.rejected += 1
+            raise ProviderRateLimited(self.name, self.blocked_until - now)
+
+        deadline = now + self.queue_timeout
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._reject("queue timeout")
+        try:
+            if self.chars_per_window:
+                await self._wait_for_budget(chars, deadline)
+            self.in_flight += 1
+            try:
+                yield
+            except ProviderRateLimited as e:
+                self.block_for(e.retry_after)
+                raise
+            finally:
+                self.in_flight -= 1
+        finally:
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, float]:
+        self._expire_usage(time.monotonic())
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "chars_in_window": self._used_chars,
+            "chars_per_window": self.chars_per_window,
+            "blocked_for": max(0.0, self.blocked_until - time.monotonic()),
+            "rejected": self.rejected
+        }
+
+
+class ProviderScheduler:
+    """所有翻译服务的准入控制，限制从环境变量读取：
+
+    PROVIDER_MAX_IN_FLIGHT_<NAME>、PROVIDER_CHARS_PER_MINUTE_<NAME>、PROVIDER_QUEUE_TIMEOUT
+    """
+
+    def __init__(self):
+        self.gates: Dict[str, ProviderGate] = {}
+        self.queue_timeout = float(os.getenv("PROVIDER_QUEUE_TIMEOUT", "5"))
+
+    def gate(self, name: str) -> ProviderGate:
+        gate = self.gates.get(name)
+        if gate is None:
+            default_in_flight, default_chars = DEFAULT_LIMITS.get(name, (8, 0))
+            key = name.upper()
+            gate = ProviderGate(
+                name,
+                max_in_flight=int(os.getenv(f"PROVIDER_MAX_IN_FLIGHT_{key}", default_in_flight)),
+                chars_per_window=int(os.getenv(f"PROVIDER_CHARS_PER_MINUTE_{key}", default_chars)),
+                queue_timeout=self.queue_timeout
+            )
+            self.gates[name] = gate
+        return gate
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {name: gate.stats() for name, gate in self.gates.items()}
@@ -0,0 +1,69 @@
+"""
+启动预热与就绪状态
+
+/api/health 只表示进程存活；预热（加载模型、试翻译、建立连接）完成前
+/api/ready 返回 503，负载均衡据此决定是否把流量转发到本实例。
+有预热步骤失败或超时时状态为 degraded，WARMUP_REQUIRE_SUCCESS=true 时 degraded 也返回 503。
+"""
+
+from typing import Any, Dict, List, Optional
+import time
+
+
+class ReadinessState:
+    """记录各预热步骤的结果，全部结束后标记为就绪"""
+
+    def __init__(self):
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.steps: List[Dict[str, Any]] = []
+
+    def begin(self):
+        self.ready = False
+        self.started_at = time.time()
+        self.finished_at = None
+        self.steps = []
+
+    def record(self, name: str, ok: bool, started: float, error: Optional[str] = None):
+        step = {"name": name, "ok": ok, "seconds": round(time.monotonic() - started, 3)}
+        if error:
+            step["error"] = error
+        self.steps.append(step)
+
+    def mark_ready(self):
+        self.ready = True
+        self.finished_at = time.time()
+
+    @property
+    def degraded(self) -> bool:
+        """是否有预热步骤失败（包括整体超时）"""
+        return any(not step["ok"] for step in self.steps)
+
+    @property
+    def status(self) -> str:
+        if not self.ready:
+            return "warming_up"
+        return "degraded" if self.degraded else "ready"
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "steps": self.steps
+        }
+
+
+def parse_model_pairs(value: str) -> List[tuple]:
+    """解析 WARMUP_MODEL_PAIRS，格式 "en-zh,zh-en"，返回 [(源语言, 目标语言)]"""
+    pairs = []
+    for item in value.split(","):
+        source, sep, target = item.strip().partition("-")
+        if sep and source and target:
+            pairs.append((source, target))
+    return pairs
+
+
+# 全局就绪状态
+readiness = ReadinessState()
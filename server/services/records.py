@@ -0,0 +1,90 @@
+"""
+帖子和回复的内部存储结构
+
+内存中使用 __slots__ 数据类保存：ID 为整数，时间为毫秒级 epoch 整数，语言代码做字符串驻留
+（所有帖子共享同一个 "en" 对象）。只在返回给客户端时通过 to_api() 转换为接口格式
+（字符串ID、ISO 8601 时间）。
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+import sys
+import time
+
+
+def to_epoch_ms(value: str) -> int:
+    """把 ISO 8601 时间（可带 Z 后缀）转换为毫秒级 epoch"""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def to_iso(epoch_ms: Optional[int]) -> Optional[str]:
+    """把毫秒级 epoch 转换为 ISO 8601 UTC 时间，格式同 JavaScript 的 toISOString()"""
+    if epoch_ms is None:
+        return None
+    seconds, millis = divmod(epoch_ms, 1000)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)) + f".{millis:03d}Z"
+
+
+def parse_id(value: str) -> Optional[int]:
+    """解析路径中的ID，格式不合法时返回None"""
+    # isdigit() 对 "²" 等非ASCII数字也返回True，但 int() 无法解析
+    return int(value) if value.isascii() and value.isdigit() else None
+
+
+@dataclass(slots=True)
+class ReplyRecord:
+    id: int
+    content: str
+    author: str
+    language: str
+    created_at: int
+    likes: int = 0
+
+    def __post_init__(self):
+        self.language = sys.intern(self.language)
+
+    def to_api(self) -> Dict[str, Any]:
+        return {
+            "id": str(self.id),
+            "content": self.content,
+            "author": self.author,
+            "language": self.language,
+            "timestamp": to_iso(self.created_at),
+            "likes": self.likes
+        }
+
+
+@dataclass(slots=True)
+class PostRecord:
+    id: int
+    title: str
+    content: str
+    author: str
+    language: str
+    created_at: int
+    likes: int = 0
+    reply_count: int = 0
+    last_reply_at: Optional[int] = None
+    excerpt: str = ""
+
+    def __post_init__(self):
+        self.language = sys.intern(self.language)
+
+    def to_api(self) -> Dict[str, Any]:
+        """转换为接口格式（PostResponse 的字段加上 excerpt）"""
+        return {
+            "id": str(self.id),
+            "title": self.title,
+            "content": self.content,
+            "author": self.author,
+            "language": self.language,
+            "timestamp": to_iso(self.created_at),
+            "likes": self.likes,
+            "reply_count": self.reply_count,
+            "last_reply_at": to_iso(self.last_reply_at),
+            "excerpt": self.excerpt
+        }
@@ -0,0 +1,72 @@
+"""
+回复存储：按帖子ID分组、按回复ID有序保存，与帖子数据分开
+
+帖子本身只保存 reply_count / last_reply_at，列表和详情的响应大小与回复数量无关；
+回复通过游标分页单独获取。回复ID由 id_generator 生成，随创建时间递增，
+因此直接用作排序键和分页游标。
+"""
+
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+import base64
+
+from services.records import ReplyRecord
+
+
+def encode_cursor(reply: ReplyRecord) -> str:
+    raw = str(reply.id).encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """解析游标，格式错误时抛出 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not raw.isdigit():
+        raise ValueError("Invalid cursor")
+    return int(raw)
+
+
+class ReplyStore:
+    """每个帖子的回复列表及其排序键"""
+
+    def __init__(self):
+        self._replies: Dict[int, List[ReplyRecord]] = {}
+        self._keys: Dict[int, List[int]] = {}
+        self.total = 0
+
+    def add(self, post_id: int, reply: ReplyRecord):
+        keys = self._keys.setdefault(post_id, [])
+        replies = self._replies.setdefault(post_id, [])
+        if not keys or reply.id >= keys[-1]:
+            # 新回复的ID通常最大，直接追加
+            keys.append(reply.id)
+            replies.append(reply)
+        else:
+            index = bisect_right(keys, reply.id)
+            keys.insert(index, reply.id)
+            replies.insert(index, reply)
+        self.total += 1
+
+    def count(self, post_id: int) -> int:
+        return len(self._keys.get(post_id, ()))
+
+    def all(self, post_id: int) -> List[ReplyRecord]:
+        return list(self._replies.get(post_id, ()))
+
+    def page(self, post_id: int, cursor: Optional[str] = None, limit: int = 20) -> Tuple[List[ReplyRecord], Optional[str]]:
+        """按时间正序返回游标之后的一页回复和下一页游标（没有更多时为None）"""
+        keys = self._keys.get(post_id, [])
+        replies = self._replies.get(post_id, [])
+        start = bisect_right(keys, decode_cursor(cursor)) if cursor else 0
+        items = replies[start:start + limit]
+        next_cursor = encode_cursor(items[-1]) if items and start + limit < len(replies) else None
+        return items, next_cursor
+
+    def remove_post(self, post_id: int) -> List[ReplyRecord]:
+        self._keys.pop(post_id, None)
+        replies = self._replies.pop(post_id, [])
+        self.total -= len(replies)
+        return replies
@@ -0,0 +1,209 @@
+"""
+帖子全文检索：增量维护的倒排索引 + BM25 排序
+
+分词规则：
+- 文本先做 NFKC 规范化和 casefold，拉丁字母去掉变音符号（é -> e），不做词干提取
+- 中日韩文字按相邻两字切分为二元组（单字时保留单字），其他文字按词切分
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import math
+import re
+import unicodedata
+
+# 各字段的词频权重
+FIELD_WEIGHTS = {
+    "title": 2.0,
+    "author": 1.5,
+    "content": 1.0,
+    "reply": 0.5
+}
+
+# 索引键：(文档ID, 语言)，原文的语言为空字符串
+IndexKey = Tuple[int, str]
+
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_CJK_CLASS = r"぀-ヿ㐀-䶿一-鿿가-힯豈-﫿"
+_TOKEN_RE = re.compile(rf"[{_CJK_CLASS}]+|[^\W{_CJK_CLASS}]+")
+_CJK_RUN_RE = re.compile(rf"[{_CJK_CLASS}]+")
+
+
+def _strip_accents(word: str) -> str:
+    if word.isascii():
+        return word
+    decomposed = unicodedata.normalize("NFD", word)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    """把文本切分为检索词"""
+    tokens = []
+    normalized = unicodedata.normalize("NFKC", text).casefold()
+    for run in _TOKEN_RE.findall(normalized):
+        if _CJK_RUN_RE.fullmatch(run):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            # 字母、数字等按整词索引
+            tokens.append(_strip_accents(run))
+    return tokens
+
+
+class SearchIndex:
+    """按文档ID维护的倒排索引，支持增量添加、追加字段文本和删除
+
+    文档的译文作为同一文档的语言变体单独索引（键为 (文档ID, 语言)，原文的语言为空字符串），
+    检索时各变体的得分按文档取最大值，因此不同语言的查询都能命中原帖。
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[IndexKey, float]] = {}
+        self._doc_terms: Dict[IndexKey, Counter] = {}
+        self._doc_lengths: Dict[IndexKey, float] = {}
+        self._doc_languages: Dict[int, str] = {}
+        # 文档ID -> {语言: 已收录译文的原文}
+        self._variants: Dict[int, Dict[str, Set[str]]] = {}
+        self._total_length = 0.0
+        # 每次变更递增，用于生成检索结果的ETag
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self._variants)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._variants
+
+    def _weighted_terms(self, field: str, text: str) -> Counter:
+        weight = FIELD_WEIGHTS.get(field, 1.0)
+        terms = Counter()
+        for token in tokenize(text):
+            terms[token] += weight
+        return terms
+
+    def _merge(self, key: IndexKey, terms: Counter):
+        self.generation += 1
+        doc_terms = self._doc_terms[key]
+        for term, weight in terms.items():
+            doc_terms[term] += weight
+            self._postings.setdefault(term, {})[key] = doc_terms[term]
+        added = sum(terms.values())
+        self._doc_lengths[key] += added
+        self._total_length += added
+
+    def _create_key(self, key: IndexKey):
+        self._doc_terms[key] = Counter()
+        self._doc_lengths[key] = 0.0
+
+    def _remove_key(self, key: IndexKey):
+        doc_terms = self._doc_terms.pop(key)
+        for term in doc_terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(key)
+        self.generation += 1
+
+    def add(self, doc_id: int, fields: Dict[str, str], language: Optional[str] = None):
+        """索引一个文档；已存在时先移除旧内容（包括译文变体）"""
+        if doc_id in self._variants:
+            self.remove(doc_id)
+        self._create_key((doc_id, ""))
+        self._variants[doc_id] = {}
+        if language:
+            self._doc_languages[doc_id] = language
+        terms = Counter()
+        for field, text in fields.items():
+            if text:
+                terms.update(self._weighted_terms(field, text))
+        self._merge((doc_id, ""), terms)
+
+    def append(self, doc_id: int, field: str, text: str):
+        """向已索引文档追加一段文本（如新回复）"""
+        if doc_id not in self._variants or not text:
+            return
+        self._merge((doc_id, ""), self._weighted_terms(field, text))
+
+    def add_translation(self, doc_id: int, language: str, field: str, source_text: str, translated_text: str) -> bool:
+        """把文档某个字段的译文加入该语言的变体；同一原文只收录一次"""
+        variants = self._variants.get(doc_id)
+        if variants is None or not translated_text or language == self._doc_languages.get(doc_id):
+            return False
+        ingested = variants.setdefault(language, set())
+        if source_text in ingested:
+            return False
+        key = (doc_id, language)
+        if key not in self._doc_terms:
+            self._create_key(key)
+        ingested.add(source_text)
+        self._merge(key, self._weighted_terms(field, translated_text))
+        return True
+
+    def remove(self, doc_id: int):
+        variants = self._variants.pop(doc_id, None)
+        if variants is None:
+            return
+        self._remove_key((doc_id, ""))
+        for language in variants:
+            key = (doc_id, language)
+            if key in self._doc_terms:
+                self._remove_key(key)
+        self._doc_languages.pop(doc_id, None)
+
+    def rebuild(self, documents: Iterable[Tuple[int, Dict[str, str], Optional[str]]]):
+        """从 (文档ID, 字段, 语言) 序列全量重建"""
+        generation = self.generation
+        self.__init__()
+        self.generation = generation + 1
+        for doc_id, fields, language in documents:
+            self.add(doc_id, fields, language)
+
+    def search(self, query: str, language: Optional[str] = None) -> List[Tuple[int, float]]:
+        """返回按 BM25 得分降序排列的 (文档ID, 得分)；language 按原文语言过滤"""
+        query_terms = Counter(tokenize(query))
+        if not query_terms or not self._doc_terms:
+            return []
+
+        key_count = len(self._doc_terms)
+        average_length = self._total_length / key_count or 1.0
+        key_scores: Dict[IndexKey, float] = {}
+        for term, query_tf in query_terms.items():
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (key_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, tf in postings.items():
+                if language and self._doc_languages.get(key[0]) != language:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lengths[key] / average_length)
+                key_scores[key] = key_scores.get(key, 0.0) + query_tf * idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        scores: Dict[int, float] = {}
+        for (doc_id, _), score in key_scores.items():
+            if score > scores.get(doc_id, 0.0):
+                scores[doc_id] = score
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "documents": len(self._variants),
+            "translated_variants": len(self._doc_terms) - len(self._variants),
+            "terms": len(self._postings)
+        }
+
+
+def merge_results(result_lists: Iterable[List[Tuple[int, float]]]) -> List[Tuple[int, float]]:
+    """合并多次检索的结果，同一文档取最高得分"""
+    scores: Dict[int, float] = {}
+    for results in result_lists:
+        for doc_id, score in results:
+            if score > scores.get(doc_id, 0.0):
+                scores[doc_id] = score
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,160 @@
+"""
+文本分段：按段落和句子切分，支持中日文标点
+切分结果保留分隔符，"".join(片段 + 分隔符) 可还原原文
+"""
+
+from typing import List, Tuple
+
+# 句末标点（拉丁文字需要后跟空白才算句子结束）
+LATIN_TERMINALS = ".!?…"
+# 中日文句末标点（后面不需要空白）
+CJK_TERMINALS = "。！？；"
+# 句末标点后可能紧跟的右引号、右括号
+CLOSING_CHARS = "\"'”’」』）)]》"
+
+# 常见缩写，后面的句点不作为句子结束
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e",
+    "fig", "approx", "mt", "mme", "mlle", "sra", "z.b", "bzw", "usw"
+}
+
+Segment = Tuple[str, str]  # (片段内容, 其后的分隔符)
+
+
+def _is_abbreviation(text: str, dot_index: int) -> bool:
+    start = dot_index
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+    word = text[start:dot_index].lower()
+    return word in ABBREVIATIONS or (len(word) == 1 and word.isalpha())
+
+
+def segment_text(text: str) -> List[Segment]:
+    """把文本切分为句子片段列表；首个片段内容可能为空（只含前导空白）"""
+    segments: List[Segment] = []
+    length = len(text)
+    i = 0
+    # 前导空白单独作为一个空片段
+    while i < length and text[i].isspace():
+        i += 1
+    if i:
+        segments.append(("", text[:i]))
+
+    start = i
+    while i < length:
+        ch = text[i]
+        end = None
+        if ch == "\n":
+            end = i
+        elif ch in CJK_TERMINALS or ch in LATIN_TERMINALS:
+            j = i + 1
+            # 连续的标点（如 "?!" "..."）和右引号归入当前句子
+            while j < length and (text[j] in LATIN_TERMINALS or text[j] in CJK_TERMINALS or text[j] in CLOSING_CHARS):
+                j += 1
+            if ch in CJK_TERMINALS or j == length or text[j].isspace():
+                if not (ch == "." and _is_abbreviation(text, i)):
+                    end = j
+            i = j - 1
+        if end is not None:
+            sep_end = end
+            while sep_end < length and text[sep_end].isspace():
+                sep_end += 1
+            if text[start:end]:
+                segments.append((text[start:end], text[end:sep_end]))
+            elif segments:
+                # 没有内容的分隔符并入前一个片段
+                core, sep = segments[-1]
+                segments[-1] = (core, sep + text[end:sep_end])
+            start = i = sep_end
+            continue
+        i += 1
+
+    if start < length:
+        tail = text[start:]
+        core = tail.rstrip()
+        segments.append((core, tail[len(core):]))
+    return segments
+
+
+def join_segments(segments: List[Segment]) -> str:
+    return "".join(core + sep for core, sep in segments)
+
+
+def adapt_separator(separator: str, target_lang: str) -> str:
+    """调整句间分隔符：中日文句子之间不加空格，其他语言句子之间至少一个空格"""
+    if "\n" in separator:
+        return separator
+    if target_lang in ("zh", "ja"):
+        return ""
+    return separator or " "
+
+
+def _is_cjk(ch: str) -> bool:
+    code = ord(ch)
+    return 0x3040 <= code <= 0x30FF or 0x3400 <= code <= 0x9FFF or 0xAC00 <= code <= 0xD7AF
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算token数：中日韩字符约1个token，其他文字约4个字符1个token"""
+    cjk = sum(1 for ch in text if _is_cjk(ch))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def _split_oversized(core: str, max_tokens: int) -> List[Segment]:
+    """单个句子超过上限时，优先在逗号处切开，其次在空白处，最后按字符硬切"""
+    pieces: List[Segment] = []
+    remaining = core
+    while estimate_tokens(remaining) > max_tokens:
+        # 找到不超过上限的最长前缀
+        low, high = 1, len(remaining)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if estimate_tokens(remaining[:mid]) <= max_tokens:
+                low = mid
+            else:
+                high = mid - 1
+        cut = low
+        for marks in ("，,、;；:：", " \t"):
+            position = max(remaining.rfind(mark, 0, cut) for mark in marks)
+            if position > cut // 2:
+                cut = position + 1
+                break
+        piece = remaining[:cut]
+        stripped = piece.rstrip()
+        pieces.append((stripped, piece[len(stripped):]))
+        remaining = remaining[cut:].lstrip()
+    if remaining:
+        pieces.append((remaining, ""))
+    return pieces
+
+
+def chunk_text(text: str, max_tokens: int) -> List[Segment]:
+    """按句子边界把长文本组合成不超过 max_tokens 的块，返回 (块内容, 其后的分隔符) 列表"""
+    chunks: List[Segment] = []
+    current: List[Segment] = []
+    current_tokens = 0
+
+    def flush():
+        if current:
+            body = join_segments(current[:-1]) + current[-1][0]
+            chunks.append((body, current[-1][1]))
+            current.clear()
+
+    for core, separator in segment_text(text):
+        if not core:
+            continue
+        tokens = estimate_tokens(core + separator)
+        if tokens > max_tokens:
+            flush()
+            current_tokens = 0
+            pieces = _split_oversized(core, max_tokens)
+            pieces[-1] = (pieces[-1][0], separator)
+            chunks.extend(pieces)
+            continue
+        if current and current_tokens + tokens > max_tokens:
+            flush()
+            current_tokens = 0
+        current.append((core, separator))
+        current_tokens += tokens
+    flush()
+    return chunks
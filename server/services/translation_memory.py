@@ -0,0 +1,45 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+import threading
+
+
+class TranslationMemory:
+    """片段级翻译记忆（LRU），键为 (源语言, 目标语言, 片段原文)"""
+
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, segment: str, source_lang: str, target_lang: str) -> Optional[str]:
+        key = (source_lang, target_lang, segment)
+        with self._lock:
+            translation = self._entries.get(key)
+            if translation is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return translation
+
+    def put(self, segment: str, source_lang: str, target_lang: str, translation: str):
+        if not self.enabled:
+            return
+        key = (source_lang, target_lang, segment)
+        with self._lock:
+            self._entries[key] = translation
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,108 @@
+"""
+用户存储：认证和用户两个路由共用同一份数据
+
+按用户ID和大小写折叠后的用户名分别建立索引，登录和按ID查找都是O(1)；
+用户ID单调递增（不再由用户数推算），列表按ID游标分页。
+"""
+
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import threading
+
+
+def username_key(username: str) -> str:
+    """用户名的索引键：去掉首尾空白并做大小写折叠（比 lower() 更适合非英文字母）"""
+    return username.strip().casefold()
+
+
+class UserRepository:
+    """内存中的用户存储"""
+
+    def __init__(self, users: Iterable[Dict[str, Any]] = ()):
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_username: Dict[str, Dict[str, Any]] = {}
+        # 按数值升序排列的用户ID，用于分页
+        self._ids: List[int] = []
+        self._next_id = 1
+        self._lock = threading.Lock()
+        for user in users:
+            self._insert(user)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def _insert(self, user: Dict[str, Any]):
+        user_id = int(user["id"])
+        self._by_id[user["id"]] = user
+        self._by_username[username_key(user["username"])] = user
+        self._ids.append(user_id)
+        self._next_id = max(self._next_id, user_id + 1)
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(user_id)
+
+    def find_by_username(self, username: str) -> Optional[Dict[str, Any]]:
+        return self._by_username.get(username_key(username))
+
+    def get_or_create(self, username: str) -> Tuple[Dict[str, Any], bool]:
+        """按用户名查找用户，不存在时创建；返回 (用户, 是否新建)"""
+        user = self.find_by_username(username)
+        if user is not None:
+            return user, False
+        with self._lock:
+            # 加锁后再查一次，避免并发登录重复创建同名用户
+            user = self.find_by_username(username)
+            if user is not None:
+                return user, False
+            username = username.strip()
+            user = {
+                "id": str(self._next_id),
+                "username": username,
+                "email": f"{username.lower()}@example.com",
+                "preferred_language": "en",
+                "join_date": datetime.utcnow().date().isoformat()
+            }
+            self._insert(user)
+            return user, True
+
+    def update(self, user_id: str, **fields) -> Optional[Dict[str, Any]]:
+        user = self._by_id.get(user_id)
+        if user is not None:
+            user.update(fields)
+        return user
+
+    def page(self, cursor: Optional[str] = None, limit: int = 20) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """按ID升序返回游标之后的一页用户和下一页游标（没有更多时为None）；游标格式错误时抛出 ValueError"""
+        if cursor is not None and not cursor.isdigit():
+            raise ValueError("Invalid cursor")
+        start = bisect_right(self._ids, int(cursor)) if cursor else 0
+        ids = self._ids[start:start + limit]
+        next_cursor = str(ids[-1]) if ids and start + limit < len(self._ids) else None
+        return [self._by_id[str(user_id)] for user_id in ids], next_cursor
+
+
+# 全局用户存储（演示用，生产环境建议使用数据库）
+user_repository = UserRepository([
+    {
+        "id": "1",
+        "username": "admin",
+        "email": "admin@example.com",
+        "preferred_language": "en",
+        "join_date": "2024-01-01"
+    },
+    {
+        "id": "2",
+        "username": "pierre",
+        "email": "pierre@example.com",
+        "preferred_language": "fr",
+        "join_date": "2024-01-02"
+    },
+    {
+        "id": "3",
+        "username": "maria",
+        "email": "maria@example.com",
+        "preferred_language": "es",
+        "join_date": "2024-01-02"
+    }
+])
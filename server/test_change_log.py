@@ -0,0 +1,60 @@
+"""
+变更日志测试：增量同步、epoch 不一致和游标超出保留窗口时要求全量同步、冗余变更合并
+"""
+
+from services.change_log import ChangeLog, compact_changes
+
+
+def _log(records: int, max_entries: int = 10) -> ChangeLog:
+    log = ChangeLog(max_entries, epoch="boot1")
+    for i in range(records):
+        log.record("post_liked", str(i), {"likes": i})
+    return log
+
+
+def test_since_returns_changes_after_version_in_order():
+    log = _log(5)
+    assert log.version == 6
+    assert [change["version"] for change in log.since(3, "boot1")] == [4, 5, 6]
+    assert log.since(6, "boot1") == []
+
+
+def test_epoch_mismatch_or_missing_epoch_forces_resync():
+    log = _log(3)
+    # 重启后的新进程版本号重新计数，旧客户端的版本号即使落在窗口内也不能用
+    assert log.since(2, "boot0") is None
+    assert log.since(2) is None
+    assert log.stats()["epoch"] == "boot1"
+
+
+def test_cursor_older_than_retained_window_forces_resync():
+    log = _log(10, max_entries=4)
+    assert log.oldest_version == 8
+    # 紧接窗口之前的版本仍可增量同步，更早的被淘汰
+    assert [change["version"] for change in log.since(7, "boot1")] == [8, 9, 10, 11]
+    assert log.since(6, "boot1") is None
+    assert log.since(0, "boot1") is None
+
+
+def test_cursor_ahead_of_server_forces_resync():
+    assert _log(2).since(99, "boot1") is None
+
+
+def test_empty_log_only_accepts_current_version():
+    log = ChangeLog(10, version=5, epoch="boot1")
+    assert log.since(5, "boot1") == []
+    assert log.since(4, "boot1") is None
+
+
+def test_compact_keeps_last_like_and_drops_posts_created_and_deleted_in_window():
+    changes = [
+        {"version": 2, "type": "post_liked", "post_id": "1", "data": {"likes": 1}},
+        {"version": 3, "type": "post_created", "post_id": "2", "data": {}},
+        {"version": 4, "type": "post_liked", "post_id": "1", "data": {"likes": 2}},
+        {"version": 5, "type": "reply_created", "post_id": "3", "data": {}},
+        {"version": 6, "type": "post_deleted", "post_id": "2", "data": {}},
+        {"version": 7, "type": "post_deleted", "post_id": "3", "data": {}},
+    ]
+    assert [(change["version"], change["type"]) for change in compact_changes(changes)] == [
+        (4, "post_liked"), (7, "post_deleted")
+    ]
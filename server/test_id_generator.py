@@ -0,0 +1,74 @@
+"""
+ID生成器测试：单调递增、位布局、时钟回拨和序列号用尽
+"""
+
+import threading
+
+import pytest
+
+from services import id_generator as ids
+from services.id_generator import ID_EPOCH_MS, MAX_SEQUENCE, SnowflakeGenerator, timestamp_of
+
+
+def _freeze_clock(monkeypatch, ms: int):
+    clock = {"ms": ms}
+    monkeypatch.setattr(ids.time, "time_ns", lambda: clock["ms"] * 1_000_000)
+    return clock
+
+
+def test_layout_encodes_timestamp_worker_and_sequence(monkeypatch):
+    now = ID_EPOCH_MS + 1000
+    _freeze_clock(monkeypatch, now)
+    generator = SnowflakeGenerator(worker_id=5)
+    first, second = generator.next_id(), generator.next_id()
+    assert timestamp_of(first) == now
+    assert (first >> 12) & 0x3FF == 5
+    assert (first & MAX_SEQUENCE, second & MAX_SEQUENCE) == (0, 1)
+
+
+def test_ids_are_unique_and_increasing_across_threads():
+    generator = SnowflakeGenerator(worker_id=1)
+    results = []
+
+    def worker():
+        results.append([generator.next_id() for _ in range(2000)])
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(batch == sorted(batch) for batch in results)
+    assert len({value for batch in results for value in batch}) == 8000
+
+
+def test_clock_moving_backwards_stays_monotonic(monkeypatch):
+    clock = _freeze_clock(monkeypatch, ID_EPOCH_MS + 5000)
+    generator = SnowflakeGenerator(worker_id=1)
+    before = generator.next_id()
+    clock["ms"] -= 2000
+    after = generator.next_id()
+    assert after > before
+    # 回拨期间沿用上次的时间戳
+    assert timestamp_of(after) == timestamp_of(before)
+    clock["ms"] += 3000
+    assert timestamp_of(generator.next_id()) == clock["ms"]
+
+
+def test_sequence_overflow_borrows_next_millisecond(monkeypatch):
+    now = ID_EPOCH_MS + 5000
+    _freeze_clock(monkeypatch, now)
+    generator = SnowflakeGenerator(worker_id=1)
+    values = [generator.next_id() for _ in range(MAX_SEQUENCE + 2)]
+    assert values == sorted(set(values))
+    assert timestamp_of(values[MAX_SEQUENCE]) == now
+    assert timestamp_of(values[-1]) == now + 1
+    assert values[-1] & MAX_SEQUENCE == 0
+
+
+def test_worker_id_comes_from_environment(monkeypatch):
+    monkeypatch.setenv("ID_WORKER_ID", "17")
+    assert SnowflakeGenerator().worker_id == 17
+    monkeypatch.setenv("ID_WORKER_ID", "1024")
+    with pytest.raises(ValueError):
+        SnowflakeGenerator()
@@ -0,0 +1,32 @@
+"""
+语言识别测试：文字系统判断、西里尔字母语言区分、短文本不作判断
+"""
+
+import pytest
+
+from services.language_detect import MIN_CONFIDENCE, detect_language
+
+
+def test_script_languages():
+    assert detect_language("これは日本語の文章です")[0] == "ja"
+    assert detect_language("이것은 한국어 문장입니다")[0] == "ko"
+    assert detect_language("这是一个中文句子")[0] == "zh"
+
+
+def test_russian_needs_russian_specific_letters():
+    detected, confidence = detect_language("Это была очень хорошая статья, спасибо вам за неё.")
+    assert detected == "ru" and confidence >= MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize("text", [
+    "Це була дуже гарна стаття, дякую вам за неї.",          # 乌克兰语
+    "Това беше много хубава статия, благодаря ви за нея.",  # 保加利亚语
+    "Ово је био веома добар чланак, хвала вам на њему.",    # 塞尔维亚语
+    "Привет",                                               # 没有可区分的字母
+])
+def test_other_cyrillic_text_is_left_to_the_provider(text):
+    assert detect_language(text) == (None, 0.0)
+
+
+def test_short_latin_text_is_not_guessed():
+    assert detect_language("Merci beaucoup") == (None, 0.0)
@@ -0,0 +1,72 @@
+"""
+点赞计数测试：分片累加与批量写回、按用户去重
+"""
+
+import asyncio
+
+from services.like_counter import LikeCounter, LikerSet
+
+
+def test_liker_set_keeps_numeric_and_other_ids():
+    likers = LikerSet()
+    assert likers.add("42") and likers.add("7") and likers.add("guest")
+    assert not likers.add("42")
+    # 非ASCII数字和超出64位的ID存入集合，而不是整数数组
+    assert likers.add("²") and likers.add(str(2 ** 64))
+    assert "7" in likers and "²" in likers and "8" not in likers
+    assert len(likers) == 5
+    assert likers.discard("²") and likers.discard(str(2 ** 64)) and likers.discard("7")
+    assert not likers.discard("7")
+    assert len(likers) == 2
+
+
+def test_increments_spread_over_shards_are_summed_on_flush():
+    counter = LikeCounter(shards=4)
+    applied = []
+    counter.bind(applied.append)
+    for _ in range(100):
+        counter.add(1, 1)
+    counter.add(2, 1)
+    counter.add(2, -1)
+    assert counter.pending(1) == 100
+    assert counter.flush() == {1: 100}
+    # 增量为0的帖子不写回
+    assert applied == [{1: 100}]
+    assert counter.pending(1) == 0
+    assert counter.flush() == {}
+    assert counter.flushes == 1
+
+
+def test_toggle_deduplicates_per_user():
+    counter = LikeCounter()
+    assert counter.toggle(1, "10", True)
+    assert not counter.toggle(1, "10", True)
+    assert counter.has_liked(1, "10")
+    assert counter.toggle(1, "10", False)
+    assert not counter.toggle(1, "10", False)
+    assert not counter.toggle(2, "10", False)
+    assert counter.pending(1) == 0
+    assert counter.flush() == {}
+
+
+def test_forget_drops_pending_likes_and_likers():
+    counter = LikeCounter()
+    counter.toggle(1, "10", True)
+    counter.forget(1)
+    assert counter.pending(1) == 0
+    assert not counter.has_liked(1, "10")
+    assert counter.stats()["tracked_posts"] == 0
+
+
+def test_background_flush_and_stop_write_back_remaining_likes():
+    async def run():
+        applied = []
+        counter = LikeCounter(flush_interval=0.01)
+        counter.bind(applied.append)
+        counter.add(1, 1)
+        await asyncio.sleep(0.05)
+        counter.add(1, 2)
+        await counter.stop()
+        return applied
+
+    assert sum(batch[1] for batch in asyncio.run(run())) == 3
@@ -0,0 +1,99 @@
+"""
+标准库版服务器的持久化测试：WAL重放、快照压缩、WAL末尾半条记录
+"""
+
+import gc
+import importlib.util
+import json
+import os
+import warnings
+
+_spec = importlib.util.spec_from_file_location(
+    "main_ultra_simple", os.path.join(os.path.dirname(os.path.abspath(__file__)), "main-ultra-simple.py")
+)
+server = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(server)
+
+
+def _open(data_dir, **options):
+    """模拟一次进程启动：新建存储，从 data_dir 恢复后开始写WAL"""
+    store = server.PostStore()
+    persistence = server.PersistenceManager(store, str(data_dir), fsync_interval=0.01, **options)
+    persistence.load()
+    persistence.start()
+    return store, persistence
+
+
+def _write_sample(store):
+    post_id = store.next_id()
+    store.add({"id": post_id, "title": "Hello", "content": "World", "likes": 0})
+    store.add_reply(post_id, {"id": "r1", "content": "Hi"})
+    store.set_likes(post_id, 3)
+    store.add({"id": store.next_id(), "title": "Second", "content": "Post", "likes": 0})
+    return post_id
+
+
+def test_restart_restores_posts_version_and_ids(tmp_path):
+    store, persistence = _open(tmp_path)
+    post_id = _write_sample(store)
+    persistence.close()
+
+    restored, persistence = _open(tmp_path)
+    post = restored.get(post_id)
+    assert (post["likes"], post["replies"]) == (3, [{"id": "r1", "content": "Hi"}])
+    assert len(restored) == 2
+    assert restored.version == store.version == 4
+    # 删除或重启后也不会复用帖子ID
+    assert restored.next_id() == "3"
+    persistence.close()
+
+
+def test_snapshot_compacts_wal_and_later_records_replay_on_top(tmp_path):
+    store, persistence = _open(tmp_path, snapshot_max_records=2)
+    _write_sample(store)
+    persistence.close()
+    assert os.path.exists(persistence.snapshot_path)
+    with open(persistence.snapshot_path, encoding="utf-8") as f:
+        assert json.load(f)["version"] >= 2
+    with open(persistence.wal_path, encoding="utf-8") as f:
+        assert len(f.readlines()) < 4
+
+    restored, persistence = _open(tmp_path)
+    assert restored.version == 4
+    assert restored.get("1")["likes"] == 3
+    assert restored.get("2")["title"] == "Second"
+    persistence.close()
+
+
+def test_torn_final_wal_record_is_ignored(tmp_path, caplog):
+    store, persistence = _open(tmp_path)
+    _write_sample(store)
+    persistence.close()
+    # 模拟写到一半时崩溃
+    with open(persistence.wal_path, "a", encoding="utf-8") as f:
+        f.write('{"op":"create","post":{"id":"9","tit')
+
+    restored, persistence = _open(tmp_path)
+    assert restored.version == 4
+    assert restored.get("9") is None and len(restored) == 2
+    assert "损坏的WAL记录" in caplog.text
+    # 恢复后的WAL可以继续写入并再次恢复
+    restored.add({"id": restored.next_id(), "title": "After", "content": "Crash", "likes": 0})
+    persistence.close()
+    again, persistence = _open(tmp_path)
+    assert again.version == 5 and again.get("3")["title"] == "After"
+    persistence.close()
+
+
+def test_start_reuses_the_wal_opened_by_the_startup_snapshot(tmp_path):
+    store, persistence = _open(tmp_path)
+    store.add({"id": store.next_id(), "title": "t", "content": "c", "likes": 0})
+    persistence.close()
+
+    # 重放后的快照已经打开了WAL，start() 再次打开会丢下一个未关闭的文件对象
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", ResourceWarning)
+        _, persistence = _open(tmp_path)
+        gc.collect()
+    assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
+    persistence.close()
@@ -0,0 +1,56 @@
+"""
+回复存储测试：游标编解码与分页
+"""
+
+import pytest
+
+from services.records import ReplyRecord
+from services.reply_store import ReplyStore, decode_cursor, encode_cursor
+
+
+def _reply(reply_id: int) -> ReplyRecord:
+    return ReplyRecord(id=reply_id, content=f"reply {reply_id}", author="a", language="en", created_at=0)
+
+
+def test_cursor_round_trips_and_is_url_safe():
+    cursor = encode_cursor(_reply(123456789012345678))
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+    assert decode_cursor(cursor) == 123456789012345678
+
+
+@pytest.mark.parametrize("cursor", ["", "!!!", "YWJj", "wrI", "LTE"])
+def test_invalid_cursors_raise_value_error(cursor):
+    # "YWJj" = "abc"，"wrI" = "²" 的 UTF-8，"LTE" = "-1"
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_pages_follow_id_order_until_exhausted():
+    store = ReplyStore()
+    # 乱序插入也按ID排序
+    for reply_id in (5, 1, 3, 2, 4):
+        store.add(7, _reply(reply_id))
+    first, cursor = store.page(7, limit=2)
+    second, cursor = store.page(7, cursor, limit=2)
+    third, last_cursor = store.page(7, cursor, limit=2)
+    assert [r.id for r in first + second + third] == [1, 2, 3, 4, 5]
+    assert last_cursor is None
+    assert store.page(7, encode_cursor(_reply(5)))[0] == []
+
+
+def test_exact_last_page_has_no_next_cursor():
+    store = ReplyStore()
+    for reply_id in (1, 2):
+        store.add(7, _reply(reply_id))
+    assert store.page(7, limit=2)[1] is None
+
+
+def test_counts_and_remove_post():
+    store = ReplyStore()
+    store.add(1, _reply(1))
+    store.add(1, _reply(2))
+    store.add(2, _reply(3))
+    assert (store.count(1), store.count(9), store.total) == (2, 0, 3)
+    assert [r.id for r in store.remove_post(1)] == [1, 2]
+    assert (store.count(1), store.total) == (0, 1)
+    assert store.page(1) == ([], None)
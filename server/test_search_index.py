@@ -0,0 +1,89 @@
+"""
+全文检索测试：分词、BM25 排序、增量更新和删除、译文变体
+"""
+
+from services.search_index import SearchIndex, merge_results, tokenize
+
+
+def _index() -> SearchIndex:
+    index = SearchIndex()
+    index.add(1, {"title": "Python tips", "content": "Use generators for large files"}, "en")
+    index.add(2, {"title": "Cooking", "content": "Python is also a snake. Bake bread slowly"}, "en")
+    index.add(3, {"title": "Café", "content": "Le café est très bon"}, "fr")
+    return index
+
+
+def test_tokenize_folds_case_width_and_accents():
+    assert tokenize("Café CRÈME ｐｙｔｈｏｎ") == ["cafe", "creme", "python"]
+
+
+def test_tokenize_splits_cjk_into_bigrams():
+    assert tokenize("机器翻译") == ["机器", "器翻", "翻译"]
+    assert tokenize("好 ok") == ["好", "ok"]
+
+
+def test_bm25_ranks_title_match_above_content_match():
+    results = _index().search("python")
+    assert [doc_id for doc_id, _ in results] == [1, 2]
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_query_matches_accent_insensitively_and_filters_by_language():
+    index = _index()
+    assert [doc_id for doc_id, _ in index.search("cafe")] == [3]
+    assert index.search("cafe", language="en") == []
+    assert index.search("   ") == []
+
+
+def test_append_makes_new_text_searchable():
+    index = _index()
+    generation = index.generation
+    index.append(2, "reply", "sourdough recipe")
+    index.append(404, "reply", "sourdough")
+    assert [doc_id for doc_id, _ in index.search("sourdough")] == [2]
+    assert index.generation > generation
+    assert 404 not in index
+
+
+def test_remove_drops_postings_and_translations():
+    index = _index()
+    index.add_translation(3, "en", "content", "Le café est très bon", "The coffee is very good")
+    index.remove(3)
+    assert index.search("coffee") == []
+    assert index.search("cafe") == []
+    assert index.stats() == {"documents": 2, "translated_variants": 0, "terms": len(index._postings)}
+    # 剩余文档的检索不受影响
+    assert [doc_id for doc_id, _ in index.search("bread")] == [2]
+
+
+def test_re_adding_a_document_replaces_old_content():
+    index = _index()
+    index.add(1, {"title": "Rust tips"}, "en")
+    assert [doc_id for doc_id, _ in index.search("python")] == [2]
+    assert [doc_id for doc_id, _ in index.search("rust")] == [1]
+    assert len(index) == 3
+
+
+def test_translations_match_original_document_once():
+    index = _index()
+    assert index.add_translation(3, "en", "content", "Le café est très bon", "The coffee is very good")
+    assert not index.add_translation(3, "en", "content", "Le café est très bon", "The coffee is very good")
+    # 与原文同语言的译文不收录
+    assert not index.add_translation(3, "fr", "content", "x", "y")
+    assert [doc_id for doc_id, _ in index.search("coffee")] == [3]
+    # 按原文语言过滤时，译文变体也归属原帖
+    assert [doc_id for doc_id, _ in index.search("coffee", language="fr")] == [3]
+    assert index.stats()["translated_variants"] == 1
+
+
+def test_rebuild_replaces_everything_and_bumps_generation():
+    index = _index()
+    generation = index.generation
+    index.rebuild([(9, {"title": "Fresh start"}, "en")])
+    assert len(index) == 1
+    assert index.search("python") == []
+    assert index.generation > generation
+
+
+def test_merge_results_keeps_best_score_per_document():
+    assert merge_results([[(1, 1.0), (2, 3.0)], [(1, 2.0)]]) == [(2, 3.0), (1, 2.0)]
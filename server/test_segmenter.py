@@ -0,0 +1,57 @@
+"""
+文本分段测试：句子切分、分隔符还原、分块
+"""
+
+from services.segmenter import adapt_separator, chunk_text, estimate_tokens, join_segments, segment_text
+
+
+def test_segments_round_trip_to_original_text():
+    text = "  Hello there. How are you?\n\nFine!  Thanks…\n"
+    assert join_segments(segment_text(text)) == text
+
+
+def test_leading_whitespace_is_an_empty_segment():
+    assert segment_text("  Hi.") == [("", "  "), ("Hi.", "")]
+
+
+def test_splits_latin_sentences_and_keeps_separators():
+    assert segment_text("One. Two!\n\nThree?") == [("One.", " "), ("Two!", "\n\n"), ("Three?", "")]
+
+
+def test_abbreviations_and_initials_do_not_end_sentences():
+    assert [core for core, _ in segment_text("Dr. Smith met J. Doe. Then left.")] == [
+        "Dr. Smith met J. Doe.", "Then left."
+    ]
+
+
+def test_cjk_terminals_split_without_whitespace():
+    assert segment_text("你好。欢迎！") == [("你好。", ""), ("欢迎！", "")]
+
+
+def test_closing_quotes_stay_with_sentence():
+    assert segment_text('He said "stop." Then went.') == [('He said "stop."', " "), ("Then went.", "")]
+
+
+def test_adapt_separator_keeps_newlines_and_drops_spaces_for_cjk():
+    assert adapt_separator("\n\n", "zh") == "\n\n"
+    assert adapt_separator(" ", "zh") == ""
+    assert adapt_separator("", "fr") == " "
+
+
+def test_estimate_tokens_counts_cjk_per_character():
+    assert estimate_tokens("你好") == 2
+    assert estimate_tokens("abcd") == 1
+
+
+def test_chunk_text_respects_limit_and_sentence_boundaries():
+    text = " ".join(f"Sentence number {i}." for i in range(20))
+    chunks = chunk_text(text, 20)
+    assert all(estimate_tokens(chunk) <= 20 for chunk, _ in chunks)
+    assert " ".join(chunk for chunk, _ in chunks) == text
+    assert all(chunk.endswith(".") for chunk, _ in chunks)
+
+
+def test_chunk_text_splits_oversized_sentence():
+    chunks = chunk_text("word, " * 50 + "end.", 10)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 10 for chunk, _ in chunks)
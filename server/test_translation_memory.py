@@ -0,0 +1,65 @@
+"""
+翻译记忆测试：LRU 淘汰，以及按片段查询记忆后拼接译文
+"""
+
+import asyncio
+
+from routes.translate import TranslationService
+from services.translation_memory import TranslationMemory
+
+
+def test_memory_hits_misses_and_lru_eviction():
+    memory = TranslationMemory(max_entries=2)
+    memory.put("a", "en", "fr", "A")
+    memory.put("b", "en", "fr", "B")
+    assert memory.get("a", "en", "fr") == "A"  # a 变为最近使用
+    memory.put("c", "en", "fr", "C")
+    assert memory.get("b", "en", "fr") is None
+    assert memory.get("a", "en", "fr") == "A"
+    assert memory.get("a", "en", "de") is None
+    assert memory.stats() == {"entries": 2, "hits": 2, "misses": 2}
+
+
+def test_disabled_memory_stores_nothing():
+    memory = TranslationMemory(max_entries=0)
+    memory.put("a", "en", "fr", "A")
+    assert not memory.enabled
+    assert len(memory) == 0
+
+
+def _service_returning(translated_text: str, service: str = "openai"):
+    translation_service = TranslationService()
+    calls = []
+
+    async def fake_translate(text, target_lang, source_lang, preferred_service):
+        calls.append(text)
+        return {"translated_text": translated_text, "service": service, "detected_language": source_lang}
+
+    translation_service._translate_chunked = fake_translate
+    return translation_service, calls
+
+
+def test_only_missing_segments_are_sent_and_aligned_results_are_cached():
+    translation_service, calls = _service_returning("Bonjour. Merci.")
+    translation_service.memory.put("Cached.", "en", "fr", "En cache.")
+    result = asyncio.run(translation_service._translate_with_memory("Hello. Thanks.\n\nCached.", "fr", "en", "openai"))
+    assert calls == ["Hello. Thanks."]
+    assert result["translated_text"] == "Bonjour. Merci.\n\nEn cache."
+    assert translation_service.memory.get("Thanks.", "en", "fr") == "Merci."
+
+
+def test_unaligned_run_keeps_trailing_paragraph_break():
+    translation_service, _ = _service_returning("Bonjour ami, fusionne-moi et moi")
+    translation_service.memory.put("This is cached.", "en", "fr", "C'est en cache.")
+    result = asyncio.run(translation_service._translate_with_memory(
+        "Hello there friend. merge me. and me.\n\nThis is cached.", "fr", "en", "openai"
+    ))
+    assert result["translated_text"] == "Bonjour ami, fusionne-moi et moi\n\nC'est en cache."
+    # 多句无法对齐时不写入记忆
+    assert translation_service.memory.get("merge me.", "en", "fr") is None
+
+
+def test_fallback_results_are_not_cached():
+    translation_service, _ = _service_returning("Hello.", service="openai_fallback")
+    asyncio.run(translation_service._translate_with_memory("Hello.", "fr", "en", "openai"))
+    assert translation_service.memory.get("Hello.", "en", "fr") is None